@@ -1,28 +1,72 @@
 import asyncio
+import dataclasses
+import functools
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Awaitable, Callable
 
 from agents import Agent, ModelSettings, RunConfig, Runner, function_tool
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
+from openai.types.responses import ResponseCompletedEvent, ResponseTextDeltaEvent
 from pydantic import BaseModel, ValidationError
 
 from .config import settings
 from .image_cache import DiskImageCache
+from .image_index import ImageNameIndex
+from .latency import StageLatency
+from .memory_cache import MemoryLRUCache, SharedMemoryCache
 from .menu_cache import MenuCache
 from .movie_api import MovieApiError, fetch_movie_details
 from .recipe_api import RecipeApiError, search_recipes
+from .seed import SEED_ROOT, SeedPack
+from .usage import UsageLedger, UsageReport, current_ledger, load_prices
 
 load_dotenv(override=True)
 
 logger = logging.getLogger(__name__)
 async_openai_client = AsyncOpenAI()
-_image_cache: dict[str, str] = {}
-_image_cache_order: list[str] = []
-_IMAGE_CACHE_MAX = 100
-disk_cache = DiskImageCache(Path(__file__).resolve().parents[1] / "cache" / "images")
-menu_cache = MenuCache(Path(__file__).resolve().parents[1] / "cache" / "menus")
+if settings.image_memory_cache == "shared":
+    image_memory_cache = SharedMemoryCache(
+        Path(settings.image_memory_cache_path)
+        if settings.image_memory_cache_path
+        else Path(__file__).resolve().parents[1] / "cache" / "image_memory_cache",
+        slot_count=settings.image_memory_cache_size,
+        slot_size=settings.image_memory_cache_slot_kb * 1024,
+    )
+else:
+    image_memory_cache = MemoryLRUCache(settings.image_memory_cache_size)
+# Bounded pool for cache file I/O and encoding, kept off the event loop.
+cache_executor = ThreadPoolExecutor(max_workers=settings.cache_io_workers, thread_name_prefix="cache-io")
+disk_cache = DiskImageCache(
+    Path(__file__).resolve().parents[1] / "cache" / "images",
+    variant_format=settings.image_variant_format,
+    executor=cache_executor,
+)
+seed_pack = SeedPack.load(Path(settings.seed_pack_path) if settings.seed_pack_path else SEED_ROOT)
+upstream_latency = StageLatency(
+    {
+        "menu": settings.menu_degrade_after_stream,
+        "recipe": settings.menu_degrade_after,
+        "image": settings.menu_degrade_after_image,
+    }
+)
+usage_report = UsageReport(load_prices(settings.model_prices))
+# Item work that outlived a request's latency budget, kept referenced until done.
+_background_tasks: set[asyncio.Task] = set()
+image_index = ImageNameIndex(
+    Path(__file__).resolve().parents[1] / "cache" / "image_index.txt",
+    threshold=settings.image_similarity_threshold,
+)
+menu_cache = MenuCache(
+    Path(__file__).resolve().parents[1] / "cache" / "menus",
+    serializer=settings.menu_cache_format,
+    compression=settings.menu_cache_compression,
+    executor=cache_executor,
+)
 
 
 @function_tool
@@ -38,32 +82,128 @@ def find_recipe(query: str) -> dict[str, str]:
     return results[0] if results else {"title": "", "source": "", "url": ""}
 
 
+class _SingleFlight:
+    """Coalesce concurrent work for the same key into one shared task.
+
+    The shared task is cancelled only when every caller waiting on it has been
+    cancelled, so one menu dropping an item does not cancel it for another.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[tuple[str, str], asyncio.Future] = {}
+        self._waiters: dict[tuple[str, str], int] = {}
+
+    def _forget(self, key: tuple[str, str], task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+
+    async def run(self, key: tuple[str, str], factory: Callable[[], Awaitable]):
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(functools.partial(self._forget, key))
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0 and not task.done():
+                    task.cancel()
+
+
+_item_flights = _SingleFlight()
+
+
+def _resolve_image_key(cache_key: str) -> str | None:
+    """Return the disk cache key holding an image for this item, reusing near-matches."""
+    if not cache_key:
+        return None
+    if disk_cache.has(cache_key):
+        image_index.add(cache_key)
+        return cache_key
+    match = image_index.nearest(cache_key)
+    if match and disk_cache.has(match[0]):
+        logger.info("Reusing image of item=%s for item=%s score=%.2f", match[0], cache_key, match[1])
+        return match[0]
+    return None
+
+
+async def _aresolve_image_key(cache_key: str) -> str | None:
+    """_resolve_image_key on the cache executor; it stats files and scans the name index."""
+    if not cache_key:
+        return None
+    return await asyncio.get_running_loop().run_in_executor(cache_executor, _resolve_image_key, cache_key)
+
+
+def _record_usage(stage: str, model: str, result, seconds: float) -> None:
+    ledger = current_ledger.get()
+    if ledger is None:
+        return
+    usage = getattr(result, "usage", None)
+    if usage is None:
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    ledger.record(stage, model, usage, seconds)
+
+
+def _over_budget() -> bool:
+    ledger = current_ledger.get()
+    return ledger is not None and ledger.over_budget
+
+
+def _route_model(agent: Agent, kwargs: dict) -> str:
+    """Return the model agent will run on, switching kwargs to the fast model once over budget."""
+    model = agent.model
+    if _over_budget() and model != settings.openai_fast_model:
+        model = settings.openai_fast_model
+        kwargs["run_config"] = dataclasses.replace(kwargs.get("run_config") or RunConfig(), model=model)
+    return model
+
+
+async def _run_agent(stage: str, agent: Agent, input, **kwargs):
+    """Runner.run with usage accounting; routes to the fast model once the menu is over budget."""
+    model = _route_model(agent, kwargs)
+    started = time.monotonic()
+    try:
+        result = await Runner.run(agent, input=input, **kwargs)
+    finally:
+        # Failed and cancelled runs count too; timeouts are what degrade looks for.
+        upstream_latency.observe(stage, time.monotonic() - started)
+    _record_usage(stage, model, result, time.monotonic() - started)
+    return result
+
+
 @function_tool
 async def generate_food_image(item_name: str) -> dict[str, str]:
     """Generate a food image via OpenAI and cache it on disk."""
     cache_key = item_name.strip().lower()
-    if cache_key:
-        cached = disk_cache.get(cache_key)
-        if cached:
-            return {"image_key": cache_key}
+    image_key = await _aresolve_image_key(cache_key)
+    if image_key:
+        return {"image_key": image_key}
 
     prompt = (
         "Studio-lit food photography, overhead view of "
         f"{item_name}, appetizing, high detail, soft shadows."
     )
     try:
+        started = time.monotonic()
         response = await async_openai_client.images.generate(
             model=settings.openai_image_model,
             prompt=prompt,
             size="1024x1024",
         )
+        _record_usage("image_generation", settings.openai_image_model, response, time.monotonic() - started)
         image_b64 = response.data[0].b64_json
     except Exception as exc:
         logger.exception("OpenAI image generation failed for item=%s", item_name)
         raise
     data_uri = f"data:image/png;base64,{image_b64}"
     if cache_key:
-        disk_cache.set(cache_key, data_uri)
+        await disk_cache.aset(cache_key, data_uri)
+        await asyncio.get_running_loop().run_in_executor(cache_executor, image_index.add, cache_key)
         return {"image_key": cache_key}
     return {"image_key": ""}
 
@@ -108,7 +248,7 @@ food_photo_generator = Agent(
         "Call generate_food_image with the item name and return JSON: "
         '{"image_key": "cache-key"}'
     ),
-    model=settings.openai_model,
+    model=settings.openai_fast_model,
     tools=[generate_food_image],
 )
 
@@ -121,7 +261,7 @@ menu_formatter = Agent(
         '"notes": "short summary"} '
         "Return ONLY JSON. If data is missing, return empty lists and an explanatory notes string."
     ),
-    model=settings.openai_model,
+    model=settings.openai_fast_model,
 )
 
 recipe_agent = Agent(
@@ -145,7 +285,7 @@ movie_searcher = Agent(
         "If found, return the movie details to PartyPlanner."
     ),
     tools=[get_movie_details],
-    model=settings.openai_model,
+    model=settings.openai_fast_model,
     model_settings=ModelSettings(tool_choice="get_movie_details"),
     handoff_description="Verify the movie exists via OMDb/TMDB and pass details forward.",
 )
@@ -187,6 +327,66 @@ def _coerce_menu_payload(payload: dict) -> dict:
     return payload
 
 
+class _MenuItemStreamParser:
+    """Incrementally scan streamed menu JSON and yield items as their objects close."""
+
+    def __init__(self, limit: int = 5) -> None:
+        self.limit = limit
+        self.emitted = 0
+        self._buffer: list[str] = []
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = ""
+        self._items_depth: int | None = None
+        self._item_start: int | None = None
+
+    def feed(self, chunk: str) -> list[MenuItem]:
+        items: list[MenuItem] = []
+        for char in chunk:
+            self._buffer.append(char)
+            index = len(self._buffer) - 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = "".join(self._buffer[self._string_start + 1 : index])
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == "[":
+                if self._stack == ["{"] and self._last_string == "items":
+                    self._items_depth = 2
+                self._stack.append("[")
+            elif char == "{":
+                self._stack.append("{")
+                if self._items_depth is not None and len(self._stack) == self._items_depth + 1:
+                    self._item_start = index
+            elif char in "]}" and self._stack:
+                self._stack.pop()
+                if char == "]" and self._items_depth is not None and len(self._stack) < self._items_depth:
+                    self._items_depth = None
+                if char == "}" and self._item_start is not None and len(self._stack) == 2:
+                    item = self._parse_item("".join(self._buffer[self._item_start : index + 1]))
+                    self._item_start = None
+                    if item and self.emitted < self.limit:
+                        self.emitted += 1
+                        items.append(item)
+        return items
+
+    @staticmethod
+    def _parse_item(raw: str) -> MenuItem | None:
+        try:
+            return MenuItem.model_validate(json.loads(raw))
+        except (json.JSONDecodeError, ValidationError):
+            return None
+
+
 def _parse_menu_output(raw_output: str) -> MenuResponse | None:
     parsed = _extract_json(raw_output)
     if parsed is None:
@@ -198,26 +398,288 @@ def _parse_menu_output(raw_output: str) -> MenuResponse | None:
         return None
 
 
-async def build_menu(movie_title: str) -> dict[str, list[str] | str]:
-    cached_menu = menu_cache.get(movie_title)
+async def _stream_menu_run(
+    stage: str,
+    agent: Agent,
+    input: str,
+    on_item: Callable[[dict], object],
+    **kwargs,
+):
+    """Runner.run_streamed for an agent writing menu JSON; each item goes to on_item as it closes.
+
+    Returns the finished run result. Accounts usage and latency like _run_agent,
+    except that each model response is charged as soon as it completes: item
+    work started later in the same stream then already sees that spend.
+    """
+    model = _route_model(agent, kwargs)
+    ledger = current_ledger.get()
+    started = response_started = time.monotonic()
+    charged = False
+    stream_parser = _MenuItemStreamParser()
+    result = Runner.run_streamed(agent, input=input, **kwargs)
+    try:
+        async for event in result.stream_events():
+            if event.type == "agent_updated_stream_event":
+                stream_parser = _MenuItemStreamParser()
+            elif event.type != "raw_response_event":
+                continue
+            elif isinstance(event.data, ResponseTextDeltaEvent):
+                for streamed_item in stream_parser.feed(event.data.delta):
+                    logger.debug("Streamed menu item=%s from agent=%s", streamed_item.name, agent.name)
+                    on_item(streamed_item.model_dump())
+            elif isinstance(event.data, ResponseCompletedEvent) and ledger is not None:
+                now = time.monotonic()
+                ledger.record(stage, model, event.data.response.usage, now - response_started)
+                response_started = now
+                charged = True
+    finally:
+        upstream_latency.observe(stage, time.monotonic() - started)
+    if not charged:
+        _record_usage(stage, model, result, time.monotonic() - started)
+    return result
+
+
+async def fetch_item_image(item: dict) -> str | None:
+    if item.get("image_data"):
+        return item.get("image_data")
+    cache_key = item.get("name", "").strip().lower()
+    if cache_key:
+        cached = image_memory_cache.get(cache_key)
+        if cached:
+            return cached
+    if cache_key and seed_pack.has_image(cache_key):
+        seeded = await asyncio.get_running_loop().run_in_executor(cache_executor, seed_pack.image, cache_key)
+        if seeded:
+            image_memory_cache.set(cache_key, seeded)
+            return seeded
+    image_key = await _aresolve_image_key(cache_key)
+    if image_key:
+        cached = await disk_cache.aget(image_key)
+        if cached:
+            image_memory_cache.set(cache_key, cached)
+            return cached
+    if _over_budget():
+        logger.warning("Skipping image generation over budget for item=%s", item.get("name"))
+        return None
+    try:
+        photo = await _run_agent(
+            "image",
+            food_photo_generator,
+            input=f"Food item: {item.get('name', '')}",
+            run_config=RunConfig(tracing_disabled=True),
+        )
+        if isinstance(photo.final_output, dict):
+            parsed_photo = photo.final_output
+        else:
+            parsed_photo = _extract_json(photo.final_output) or photo.final_output
+        if isinstance(parsed_photo, dict) and parsed_photo.get("image_key"):
+            cached = await disk_cache.aget(parsed_photo["image_key"])
+            if cached:
+                if cache_key:
+                    image_memory_cache.set(cache_key, cached)
+                return cached
+    except Exception:
+        logger.exception("Image generation failed for item=%s", item.get("name"))
+    return None
+
+
+async def _fallback_recipe(item_name: str) -> dict[str, str]:
+    try:
+        seed = await asyncio.to_thread(search_recipes, item_name, 1)
+    except RecipeApiError:
+        seed = []
+    seed = seed[0] if seed else {"title": "", "source": "", "url": ""}
+    title = seed.get("title") or item_name
+    source = seed.get("source", "")
+    url = seed.get("url", "")
+    # seed.is_placeholder_recipe recognizes this text; keep the two in sync.
+    return {
+        "title": title,
+        "source": source,
+        "url": url,
+        "ingredients": [
+            f"{item_name} base ingredient",
+            "Seasoning to taste",
+            "Optional garnish",
+        ],
+        "steps": [
+            f"Prepare the {item_name} ingredients.",
+            "Cook until done and season to taste.",
+            "Plate and add garnish.",
+        ],
+    }
+
+
+async def fetch_item_recipe(item_name: str) -> dict[str, str]:
+    seeded = seed_pack.recipe(item_name)
+    if seeded:
+        return seeded
+    if _over_budget():
+        return await _fallback_recipe(item_name)
+    try:
+        run = await _run_agent(
+            "recipe",
+            recipe_agent,
+            input=f"Menu item: {item_name}",
+            max_turns=4,
+            run_config=RunConfig(tracing_disabled=True),
+        )
+        payload = run.final_output if isinstance(run.final_output, dict) else _extract_json(run.final_output)
+        if isinstance(payload, dict) and payload.get("title"):
+            return payload
+    except Exception:
+        logger.exception("Recipe generation failed for item=%s", item_name)
+    return await _fallback_recipe(item_name)
+
+
+async def _item_recipe(item: dict) -> dict[str, str]:
+    if (item.get("recipe") or {}).get("title"):
+        return item["recipe"]
+    return await fetch_item_recipe(item.get("name", ""))
+
+
+async def _finish_in_background(movie_title: str, pending: dict[str, tuple[asyncio.Task, asyncio.Task]]) -> None:
+    """Wait for item work that missed the latency budget and fold it into the cached menu."""
+    await asyncio.gather(*(task for pair in pending.values() for task in pair), return_exceptions=True)
+    menu = await menu_cache.aget(movie_title)
+    if not menu:
+        return
+    for item in menu.get("items", []):
+        key = item.get("name", "").strip().lower()
+        if key not in pending:
+            continue
+        image_task, recipe_task = pending[key]
+        if not image_task.cancelled() and image_task.exception() is None and image_task.result():
+            item["image_data"] = image_task.result()
+        if not recipe_task.cancelled() and recipe_task.exception() is None and recipe_task.result().get("title"):
+            item["recipe"] = recipe_task.result()
+        item.pop("pending", None)
+    await menu_cache.aset(movie_title, menu)
+    logger.info("Completed pending menu items in background for title=%s", movie_title)
+
+
+async def build_menu(
+    movie_title: str,
+    image_variant: str | None = None,
+    on_progress: Callable[[dict], None] | None = None,
+    latency_budget: float | None = None,
+    item_results: dict[tuple[str, str], object] | None = None,
+) -> dict[str, list[str] | str]:
+    """Build the menu for movie_title.
+
+    item_results, when given, holds finished image and recipe results by
+    (kind, item key) and is shared by every menu of one batch request, so a
+    dish another menu already finished is not generated again.
+    """
+    ledger = UsageLedger(movie_title, usage_report, budget=settings.menu_budget_usd)
+    token = current_ledger.set(ledger)
+    try:
+        return await _build_menu(movie_title, image_variant, on_progress, latency_budget, item_results)
+    finally:
+        current_ledger.reset(token)
+        usage_report.add_menu(ledger)
+
+
+async def _build_menu(
+    movie_title: str,
+    image_variant: str | None,
+    on_progress: Callable[[dict], None] | None,
+    latency_budget: float | None,
+    item_results: dict[tuple[str, str], object] | None,
+) -> dict[str, list[str] | str]:
+    started = time.monotonic()
+    if latency_budget is None and upstream_latency.degraded:
+        logger.warning(
+            "Upstream latency above threshold (%s); applying %.0fs budget for title=%s",
+            ", ".join(f"{stage}={average:.1f}s" for stage, average in upstream_latency.degraded_stages().items()),
+            settings.menu_latency_budget,
+            movie_title,
+        )
+        latency_budget = settings.menu_latency_budget
+    # Image and recipe work keyed by normalized item name, started as soon as
+    # each item is known (possibly while the menu is still being generated).
+    item_tasks: dict[str, tuple[asyncio.Task, asyncio.Task]] = {}
+    # Partial results (no image payloads) reported to on_progress as work lands.
+    progress_items: dict[str, dict] = {}
+
+    def _report(stage: str) -> None:
+        if on_progress is not None:
+            on_progress({"stage": stage, "items": list(progress_items.values())})
+
+    def _on_item_done(key: str, field: str, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None or key not in progress_items:
+            return
+        result = task.result()
+        if field == "image":
+            progress_items[key]["image_ready"] = bool(result)
+        elif result.get("title"):
+            progress_items[key]["recipe"] = result
+        _report("items")
+
+    async def _item_work(flight_key: tuple[str, str], factory: Callable[[], Awaitable]):
+        if item_results is not None and flight_key in item_results:
+            return item_results[flight_key]
+
+        async def _remember():
+            result = await factory()
+            if item_results is not None:
+                item_results[flight_key] = result
+            return result
+
+        return await _item_flights.run(flight_key, _remember)
+
+    def _start_item_tasks(item: dict) -> tuple[asyncio.Task, asyncio.Task]:
+        key = item.get("name", "").strip().lower()
+        if key not in item_tasks:
+            item_tasks[key] = (
+                asyncio.create_task(
+                    _item_work(("image", key), functools.partial(fetch_item_image, dict(item)))
+                ),
+                asyncio.create_task(
+                    _item_work(("recipe", key), functools.partial(_item_recipe, dict(item)))
+                ),
+            )
+            progress_items[key] = {
+                "name": item.get("name", ""),
+                "reason": item.get("reason", ""),
+                "image_ready": False,
+                "recipe": None,
+            }
+            item_tasks[key][0].add_done_callback(functools.partial(_on_item_done, key, "image"))
+            item_tasks[key][1].add_done_callback(functools.partial(_on_item_done, key, "recipe"))
+            _report("items")
+        return item_tasks[key]
+
+    def _cancel_item_tasks() -> None:
+        for image_task, recipe_task in item_tasks.values():
+            image_task.cancel()
+            recipe_task.cancel()
+
+    cached_menu = await menu_cache.aget(movie_title)
     if cached_menu:
         logger.info("Menu cache hit for title=%s", movie_title)
         menu_payload = cached_menu
     else:
         menu_payload = None
     if menu_payload is None:
+        _report("menu")
         try:
-            result = await Runner.run(
+            result = await _stream_menu_run(
+                "menu",
                 manager,
                 input=(f"Movie title: {movie_title}. Verify it and build the menu."),
+                on_item=_start_item_tasks,
             )
         except MovieApiError as exc:
+            _cancel_item_tasks()
             logger.exception("Movie lookup failed for menu title=%s", movie_title)
             return {"items": [], "notes": str(exc)}
         except RecipeApiError as exc:
+            _cancel_item_tasks()
             logger.exception("Recipe lookup failed for title=%s", movie_title)
             return {"items": [], "notes": str(exc)}
         except Exception as exc:
+            _cancel_item_tasks()
             logger.exception("Agents menu generation failed for title=%s", movie_title)
             return {"items": [], "notes": "Menu generation failed"}
 
@@ -229,7 +691,8 @@ async def build_menu(movie_title: str) -> dict[str, list[str] | str]:
             )
             logger.debug("Raw menu output: %s", str(result.final_output)[:2000])
             try:
-                repair = await Runner.run(
+                repair = await _run_agent(
+                    "menu_repair",
                     menu_formatter,
                     input=result.final_output,
                 )
@@ -242,13 +705,16 @@ async def build_menu(movie_title: str) -> dict[str, list[str] | str]:
         if not parsed or not parsed.items:
             logger.warning("Menu items missing for title=%s. Retrying with direct food agent.", movie_title)
             try:
-                details = fetch_movie_details(movie_title)
-                retry = await Runner.run(
+                details = await asyncio.to_thread(fetch_movie_details, movie_title)
+                # Streamed like the manager run, so item work starts as each item closes.
+                retry = await _stream_menu_run(
+                    "menu_retry",
                     movie_food_items,
                     input=(
                         f"Movie title: {details.get('title')} ({details.get('year')}). "
                         f"Plot: {details.get('plot')}"
                     ),
+                    on_item=_start_item_tasks,
                     max_turns=2,
                 )
                 parsed = _parse_menu_output(retry.final_output)
@@ -257,96 +723,60 @@ async def build_menu(movie_title: str) -> dict[str, list[str] | str]:
                 parsed = None
 
         if not parsed or not parsed.items:
+            _cancel_item_tasks()
             return {"items": [], "notes": "No menu items were provided."}
 
         menu_payload = parsed.model_dump()
-    async def _fetch_image(item: dict) -> str | None:
-        if item.get("image_data"):
-            return item.get("image_data")
-        cache_key = item.get("name", "").strip().lower()
-        if cache_key and cache_key in _image_cache:
-            return _image_cache[cache_key]
-        if cache_key:
-            cached = disk_cache.get(cache_key)
-            if cached:
-                _image_cache[cache_key] = cached
-                _image_cache_order.append(cache_key)
-                return cached
-        try:
-            photo = await Runner.run(
-                food_photo_generator,
-                input=f"Food item: {item.get('name', '')}",
-                run_config=RunConfig(tracing_disabled=True),
-            )
-            if isinstance(photo.final_output, dict):
-                parsed_photo = photo.final_output
-            else:
-                parsed_photo = _extract_json(photo.final_output) or photo.final_output
-            if isinstance(parsed_photo, dict) and parsed_photo.get("image_key"):
-                cached = disk_cache.get(parsed_photo["image_key"])
-                if cached:
-                    if cache_key:
-                        _image_cache[cache_key] = cached
-                        _image_cache_order.append(cache_key)
-                        if len(_image_cache_order) > _IMAGE_CACHE_MAX:
-                            oldest = _image_cache_order.pop(0)
-                            _image_cache.pop(oldest, None)
-                    return cached
-        except Exception:
-            logger.exception("Image generation failed for item=%s", item.get("name"))
-        return None
-
-    async def _fallback_recipe(item_name: str) -> dict[str, str]:
-        seed = search_recipes(item_name, limit=1)
-        seed = seed[0] if seed else {"title": "", "source": "", "url": ""}
-        title = seed.get("title") or item_name
-        source = seed.get("source", "")
-        url = seed.get("url", "")
-        return {
-            "title": title,
-            "source": source,
-            "url": url,
-            "ingredients": [
-                f"{item_name} base ingredient",
-                "Seasoning to taste",
-                "Optional garnish",
-            ],
-            "steps": [
-                f"Prepare the {item_name} ingredients.",
-                "Cook until done and season to taste.",
-                "Plate and add garnish.",
-            ],
-        }
-
-    async def _fetch_recipe(item_name: str) -> dict[str, str]:
-        try:
-            run = await Runner.run(
-                recipe_agent,
-                input=f"Menu item: {item_name}",
-                max_turns=4,
-                run_config=RunConfig(tracing_disabled=True),
-            )
-            payload = run.final_output if isinstance(run.final_output, dict) else _extract_json(run.final_output)
-            if isinstance(payload, dict) and payload.get("title"):
-                return payload
-        except Exception:
-            logger.exception("Recipe generation failed for item=%s", item_name)
-        return await _fallback_recipe(item_name)
 
     items = menu_payload.get("items", [])
-    image_tasks = [_fetch_image(item) for item in items]
-    recipe_tasks = [_fetch_recipe(item.get("name", "")) for item in items]
-    image_results, recipes = await asyncio.gather(
-        asyncio.gather(*image_tasks),
-        asyncio.gather(*recipe_tasks),
-    )
-    for item, image_data in zip(items, image_results, strict=False):
-        if image_data:
-            item["image_data"] = image_data
+    pending = [_start_item_tasks(item) for item in items]
+    used = {id(task) for pair in pending for task in pair}
+    for key, (image_task, recipe_task) in item_tasks.items():
+        if id(image_task) not in used:
+            # Streamed early but dropped from the final menu.
+            image_task.cancel()
+            recipe_task.cancel()
+            progress_items.pop(key, None)
+    tasks = [task for pair in pending for task in pair]
+    timeout = None if latency_budget is None else max(0.0, started + latency_budget - time.monotonic())
+    _, not_done = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+    late: dict[str, tuple[asyncio.Task, asyncio.Task]] = {}
+    for item, (image_task, recipe_task) in zip(items, pending, strict=False):
+        item.pop("pending", None)
+        if image_task in not_done or recipe_task in not_done:
+            late[item.get("name", "").strip().lower()] = (image_task, recipe_task)
+            item["pending"] = [
+                part
+                for part, task in (("image", image_task), ("recipe", recipe_task))
+                if task in not_done
+            ]
+        if image_task not in not_done and image_task.result():
+            item["image_data"] = image_task.result()
+        if recipe_task not in not_done and recipe_task.result().get("title"):
+            item["recipe"] = recipe_task.result()
+
+    await menu_cache.aset(movie_title, menu_payload)
+    if late:
+        logger.warning("Returning partial menu for title=%s pending=%s", movie_title, sorted(late))
+        background = asyncio.create_task(_finish_in_background(movie_title, late))
+        _background_tasks.add(background)
+        background.add_done_callback(_background_tasks.discard)
+    if image_variant:
+        return await _with_image_variant(menu_payload, image_variant)
+    return menu_payload
 
-    for item, recipe in zip(items, recipes, strict=False):
-        if recipe.get("title"):
-            item["recipe"] = recipe
 
-    menu_cache.set(movie_title, menu_payload)
-    return menu_payload
+async def _with_image_variant(menu_payload: dict, image_variant: str) -> dict:
+    items = [dict(item) for item in menu_payload.get("items", [])]
+    image_keys = await asyncio.gather(
+        *(_aresolve_image_key(item.get("name", "").strip().lower()) for item in items)
+    )
+    variants = await asyncio.gather(
+        *(disk_cache.aget(image_key, image_variant) for image_key in image_keys if image_key)
+    )
+    variants = iter(variants)
+    for item, image_key in zip(items, image_keys, strict=True):
+        variant_data = next(variants) if image_key else None
+        if variant_data:
+            item["image_data"] = variant_data
+    return {**menu_payload, "items": items}
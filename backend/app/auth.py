@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import Any
 
 import requests
@@ -15,6 +16,10 @@ class GoogleAuthError(Exception):
 
 logger = logging.getLogger(__name__)
 
+_SUBJECT_CACHE_TTL = 300.0
+_SUBJECT_CACHE_MAX = 10000
+_subject_cache: dict[str, tuple[str | None, float]] = {}
+
 
 def verify_google_token(token: str) -> dict[str, Any]:
     if not settings.google_client_id:
@@ -37,6 +42,25 @@ def verify_google_token(token: str) -> dict[str, Any]:
     }
 
 
+def cached_token_subject(token: str) -> str | None:
+    """Return the Google `sub` for a token, or None if it does not verify.
+
+    Results are cached briefly so per-request callers avoid re-verifying.
+    """
+    now = time.monotonic()
+    cached = _subject_cache.get(token)
+    if cached and cached[1] > now:
+        return cached[0]
+    try:
+        subject = verify_google_token(token).get("sub")
+    except GoogleAuthError:
+        subject = None
+    if len(_subject_cache) >= _SUBJECT_CACHE_MAX:
+        _subject_cache.clear()
+    _subject_cache[token] = (subject, now + _SUBJECT_CACHE_TTL)
+    return subject
+
+
 def exchange_code_for_token(code: str) -> dict[str, Any]:
     if not settings.google_client_id or not settings.google_client_secret:
         raise GoogleAuthError("Google client ID/secret not configured")
@@ -0,0 +1,162 @@
+"""Pack the menu and image caches into one read-only, memory-mappable bundle.
+
+Layout (little-endian):
+
+    header   8s magic, I entry count, I reserved
+    toc      count x (B kind, 3x, I key length, 32s sha256(key), Q offset, Q length),
+             sorted by (kind, digest) for binary search
+    data     per entry: utf-8 key, then the entry bytes at offset; menus as
+             compact JSON, images as stored on disk
+
+Usage:
+    python -m backend.app.bundle export flickfeast.bundle
+    python -m backend.app.bundle import flickfeast.bundle
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+from pathlib import Path
+
+from .menu_cache import MenuCache, safe_key
+
+BUNDLE_MAGIC = b"FFBNDL01"
+KIND_MENU = 1
+KIND_IMAGE = 2
+_HEADER = struct.Struct("<8sII")
+_TOC_ENTRY = struct.Struct("<B3xI32sQQ")
+_CACHE_ROOT = Path(__file__).resolve().parents[1] / "cache"
+
+
+class BundleError(Exception):
+    pass
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode("utf-8")).digest()
+
+
+class MenuBundle:
+    """Read-only view over a bundle file; lookups return slices of the mapping."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        if len(self._map) < _HEADER.size:
+            raise BundleError(f"Bundle too small: {path}")
+        magic, count, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f"Not a flickfeast bundle: {path}")
+        self.count = count
+
+    def _entry(self, index: int) -> tuple[int, int, bytes, int, int]:
+        return _TOC_ENTRY.unpack_from(self._map, _HEADER.size + index * _TOC_ENTRY.size)
+
+    def entries(self):
+        """Yield (kind, key, data) for every entry in TOC order."""
+        for index in range(self.count):
+            kind, key_length, _, offset, length = self._entry(index)
+            key = bytes(self._view[offset - key_length : offset]).decode("utf-8")
+            yield kind, key, self._view[offset : offset + length]
+
+    def get(self, kind: int, key: str) -> memoryview | None:
+        target = (kind, _digest(key))
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_kind, _, digest, offset, length = self._entry(middle)
+            if (entry_kind, digest) < target:
+                low = middle + 1
+            elif (entry_kind, digest) > target:
+                high = middle
+            else:
+                return self._view[offset : offset + length]
+        return None
+
+    def menu(self, title: str) -> memoryview | None:
+        return self.get(KIND_MENU, safe_key(title))
+
+    def image(self, filename: str) -> memoryview | None:
+        return self.get(KIND_IMAGE, filename)
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+
+def write_bundle(path: Path, entries: list[tuple[int, str, bytes]]) -> int:
+    """Write (kind, key, data) entries to path and return the entry count."""
+    toc = sorted(
+        ((kind, _digest(key), key.encode("utf-8"), data) for kind, key, data in entries),
+        key=lambda entry: entry[:2],
+    )
+    offset = _HEADER.size + len(toc) * _TOC_ENTRY.size
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(BUNDLE_MAGIC, len(toc), 0))
+        for kind, digest, key, data in toc:
+            offset += len(key)
+            handle.write(_TOC_ENTRY.pack(kind, len(key), digest, offset, len(data)))
+            offset += len(data)
+        for _, _, key, data in toc:
+            handle.write(key)
+            handle.write(data)
+    tmp_path.replace(path)
+    return len(toc)
+
+
+def export_bundle(path: Path, menus_dir: Path, images_dir: Path) -> int:
+    menu_cache = MenuCache(menus_dir)
+    entries: list[tuple[int, str, bytes]] = []
+    for menu_path in sorted(menus_dir.glob("*.json")):
+        payload = menu_cache.get(menu_path.stem)
+        if payload is None:
+            continue
+        data = json.dumps(payload, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+        entries.append((KIND_MENU, menu_path.stem, data))
+    for image_path in sorted(images_dir.glob("*.*")):
+        if image_path.suffix in (".png", ".webp", ".avif"):
+            entries.append((KIND_IMAGE, image_path.name, image_path.read_bytes()))
+    return write_bundle(path, entries)
+
+
+def import_bundle(path: Path, menus_dir: Path, images_dir: Path) -> int:
+    """Unpack a bundle into local cache directories, e.g. to warm a writable node."""
+    menu_cache = MenuCache(menus_dir)
+    images_dir.mkdir(parents=True, exist_ok=True)
+    bundle = MenuBundle(path)
+    count = 0
+    try:
+        for kind, key, data in bundle.entries():
+            if kind == KIND_MENU:
+                menu_cache.set(key, json.loads(bytes(data)))
+            elif kind == KIND_IMAGE:
+                (images_dir / Path(key).name).write_bytes(data)
+            data.release()
+            count += 1
+    finally:
+        bundle.close()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("bundle", type=Path)
+    parser.add_argument("--menus", type=Path, default=_CACHE_ROOT / "menus")
+    parser.add_argument("--images", type=Path, default=_CACHE_ROOT / "images")
+    args = parser.parse_args()
+    if args.command == "export":
+        count = export_bundle(args.bundle, args.menus, args.images)
+        print(f"Wrote {count} entries to {args.bundle}")
+    else:
+        count = import_bundle(args.bundle, args.menus, args.images)
+        print(f"Imported {count} entries from {args.bundle}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""Record upstream calls made while building menus and replay them later.
+
+In record mode every outbound call made by movie_api, recipe_api, the agents
+Runner and async_openai_client is passed through and written to a cassette
+with its result and duration. In replay mode the same calls are answered from
+the cassette, sleeping for the recorded duration times latency_scale, so
+build_menu can be benchmarked and regression-tested without network access.
+
+Calls made inside an agent run are not recorded on their own, because
+replaying the run does not execute its tools. Disk image cache writes made by
+those tools are kept as effects of the run and redone on replay.
+
+Usage:
+    python -m backend.app.cassette record cassettes/jaws.json Jaws
+    python -m backend.app.cassette replay cassettes/jaws.json --latency-scale 0
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import importlib
+import json
+import logging
+import tempfile
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from openai.types.responses import ResponseTextDeltaEvent
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# The run whose tools are executing, so their effects are attached to it.
+_current_run: contextvars.ContextVar[dict | None] = contextvars.ContextVar("cassette_run", default=None)
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a call the cassette has no recording of."""
+
+
+def _encode(value):
+    if isinstance(value, BaseModel):
+        cls = type(value)
+        return {"__model__": f"{cls.__module__}:{cls.__qualname__}", "data": value.model_dump(mode="json")}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and "__model__" in value:
+        return _import(value["__model__"]).model_validate(value["data"])
+    return value
+
+
+def _import(path: str):
+    module, _, name = path.partition(":")
+    target = importlib.import_module(module)
+    for part in name.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def _encode_error(exc: BaseException) -> dict:
+    cls = type(exc)
+    return {"type": f"{cls.__module__}:{cls.__qualname__}", "message": str(exc)}
+
+
+def _raise_error(error: dict) -> None:
+    try:
+        cls = _import(error["type"])
+    except (ImportError, AttributeError):
+        cls = RuntimeError
+    if not (isinstance(cls, type) and issubclass(cls, Exception)):
+        cls = RuntimeError
+    raise cls(error["message"])
+
+
+def _call_key(*args, **kwargs) -> str:
+    return json.dumps([args, kwargs], sort_keys=True, default=str)
+
+
+def _agent_key(agent, input) -> str:
+    return _call_key(getattr(agent, "name", str(agent)), _encode(input))
+
+
+class _RecordedStream:
+    """A streamed run result whose events are recorded as they are consumed."""
+
+    def __init__(self, result, stream_events) -> None:
+        self._result = result
+        self.stream_events = stream_events
+
+    def __getattr__(self, name: str):
+        return getattr(self._result, name)
+
+
+class Cassette:
+    def __init__(self, path: Path, mode: str = "replay", latency_scale: float = 1.0) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.entries: list[dict] = []
+        self.meta: dict = {}
+        self._queues: dict[tuple[str, str], deque[dict]] = defaultdict(deque)
+        if mode == "replay":
+            self.load()
+
+    def load(self) -> None:
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+        self.meta = data.get("meta", {})
+        self.entries = data.get("entries", [])
+        self._queues.clear()
+        for entry in self.entries:
+            self._queues[(entry["target"], entry["key"])].append(entry)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": CASSETTE_VERSION, "meta": self.meta, "entries": self.entries}
+        self.path.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        logger.info("Wrote %s cassette entries to %s", len(self.entries), self.path)
+
+    def _next(self, target: str, key: str) -> dict:
+        queue = self._queues.get((target, key))
+        if not queue:
+            raise CassetteMiss(f"No recording for {target} {key[:200]}")
+        return queue.popleft()
+
+    def _append(self, entry: dict) -> dict:
+        if _current_run.get() is None:
+            self.entries.append(entry)
+        return entry
+
+    # Plain function calls (movie_api, recipe_api).
+
+    def _wrap_sync(self, target: str, func):
+        def recording(*args, **kwargs):
+            entry = {"target": target, "key": _call_key(*args, **kwargs)}
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                entry["error"] = _encode_error(exc)
+                raise
+            else:
+                entry["result"] = _encode(result)
+                return result
+            finally:
+                entry["elapsed"] = time.perf_counter() - started
+                self._append(entry)
+
+        def replaying(*args, **kwargs):
+            entry = self._next(target, _call_key(*args, **kwargs))
+            time.sleep(entry["elapsed"] * self.latency_scale)
+            if "error" in entry:
+                _raise_error(entry["error"])
+            return _decode(entry["result"])
+
+        return recording if self.mode == "record" else replaying
+
+    def _wrap_async(self, target: str, func):
+        async def recording(*args, **kwargs):
+            entry = {"target": target, "key": _call_key(*args, **kwargs)}
+            started = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as exc:
+                entry["error"] = _encode_error(exc)
+                raise
+            else:
+                entry["result"] = _encode(result)
+                return result
+            finally:
+                entry["elapsed"] = time.perf_counter() - started
+                self._append(entry)
+
+        async def replaying(*args, **kwargs):
+            entry = self._next(target, _call_key(*args, **kwargs))
+            await asyncio.sleep(entry["elapsed"] * self.latency_scale)
+            if "error" in entry:
+                _raise_error(entry["error"])
+            return _decode(entry["result"])
+
+        return recording if self.mode == "record" else replaying
+
+    # Agent runs, whose tools may write to the disk image cache.
+
+    def _wrap_effect(self, target: str, method):
+        def recording(instance, *args):
+            run = _current_run.get()
+            if run is not None:
+                run["effects"].append(
+                    {
+                        "target": target,
+                        "at": time.perf_counter() - run["started"],
+                        "args": [_encode(arg) for arg in args],
+                    }
+                )
+            return method(instance, *args)
+
+        return recording if self.mode == "record" else method
+
+    def _apply_effects(self, effects: list[dict], effect_targets: dict) -> None:
+        for effect in effects:
+            effect_targets[effect["target"]](*(_decode(arg) for arg in effect["args"]))
+
+    def _wrap_run(self, run, effect_targets: dict):
+        async def recording(starting_agent, input, **kwargs):
+            entry = {
+                "target": "Runner.run",
+                "key": _agent_key(starting_agent, input),
+                "effects": [],
+                "started": time.perf_counter(),
+            }
+            # Effects of nested runs (agents used as tools) belong to the outermost run.
+            token = _current_run.set(_current_run.get() or entry)
+            try:
+                result = await run(starting_agent, input, **kwargs)
+            except Exception as exc:
+                entry["error"] = _encode_error(exc)
+                raise
+            else:
+                entry["result"] = _encode(result.final_output)
+                return result
+            finally:
+                _current_run.reset(token)
+                entry["elapsed"] = time.perf_counter() - entry.pop("started")
+                self._append(entry)
+
+        async def replaying(starting_agent, input, **kwargs):
+            entry = self._next("Runner.run", _agent_key(starting_agent, input))
+            await asyncio.sleep(entry["elapsed"] * self.latency_scale)
+            self._apply_effects(entry.get("effects", []), effect_targets)
+            if "error" in entry:
+                _raise_error(entry["error"])
+            return SimpleNamespace(final_output=_decode(entry["result"]))
+
+        return recording if self.mode == "record" else replaying
+
+    def _wrap_run_streamed(self, run_streamed, effect_targets: dict):
+        cassette = self
+
+        def recording(starting_agent, input, **kwargs):
+            entry = {
+                "target": "Runner.run_streamed",
+                "key": _agent_key(starting_agent, input),
+                "events": [],
+                "effects": [],
+                "started": time.perf_counter(),
+            }
+            # The run's background task copies the context here, so its tools see entry.
+            token = _current_run.set(_current_run.get() or entry)
+            try:
+                result = run_streamed(starting_agent, input, **kwargs)
+            finally:
+                _current_run.reset(token)
+
+            async def recorded_events():
+                try:
+                    async for event in result.stream_events():
+                        at = time.perf_counter() - entry["started"]
+                        if event.type == "agent_updated_stream_event":
+                            entry["events"].append({"at": at, "agent": event.new_agent.name})
+                        elif event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+                            entry["events"].append({"at": at, "delta": event.data.delta})
+                        yield event
+                except Exception as exc:
+                    entry["error"] = _encode_error(exc)
+                    raise
+                else:
+                    entry["result"] = _encode(result.final_output)
+                finally:
+                    entry["elapsed"] = time.perf_counter() - entry.pop("started")
+                    cassette._append(entry)
+
+            return _RecordedStream(result, recorded_events)
+
+        def replaying(starting_agent, input, **kwargs):
+            entry = self._next("Runner.run_streamed", _agent_key(starting_agent, input))
+            result = SimpleNamespace(final_output=None)
+
+            async def replayed_events():
+                started = time.perf_counter()
+                timeline = sorted(
+                    [(event["at"], "event", event) for event in entry.get("events", [])]
+                    + [(effect["at"], "effect", effect) for effect in entry.get("effects", [])],
+                    key=lambda step: step[0],
+                )
+                for at, kind, step in timeline:
+                    delay = at * cassette.latency_scale - (time.perf_counter() - started)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    if kind == "effect":
+                        cassette._apply_effects([step], effect_targets)
+                    elif "agent" in step:
+                        yield SimpleNamespace(
+                            type="agent_updated_stream_event", new_agent=SimpleNamespace(name=step["agent"])
+                        )
+                    else:
+                        yield SimpleNamespace(
+                            type="raw_response_event",
+                            data=ResponseTextDeltaEvent.model_construct(
+                                type="response.output_text.delta", delta=step["delta"]
+                            ),
+                        )
+                delay = entry["elapsed"] * cassette.latency_scale - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if "error" in entry:
+                    _raise_error(entry["error"])
+                result.final_output = _decode(entry["result"])
+
+            result.stream_events = replayed_events
+            return result
+
+        return recording if self.mode == "record" else replaying
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Patch the upstream call sites for the duration of the block."""
+        from . import agents_flow, main, movie_api, recipe_api
+        from .image_cache import DiskImageCache
+
+        # Resolved on replay, so effects land in whatever cache is current then.
+        effect_targets = {"disk_cache.set": lambda *args: agents_flow.disk_cache.set(*args)}
+        fetch_movie_details = self._wrap_sync("movie_api.fetch_movie_details", movie_api.fetch_movie_details)
+        search_movies = self._wrap_sync("movie_api.search_movies", movie_api.search_movies)
+        search_recipes = self._wrap_sync("recipe_api.search_recipes", recipe_api.search_recipes)
+        images = agents_flow.async_openai_client.images
+        patches = [
+            mock.patch.object(agents_flow, "fetch_movie_details", fetch_movie_details),
+            mock.patch.object(agents_flow, "search_recipes", search_recipes),
+            mock.patch.object(main, "search_movies", search_movies),
+            mock.patch.object(images, "generate", self._wrap_async("openai.images.generate", images.generate)),
+            mock.patch.object(agents_flow.Runner, "run", self._wrap_run(agents_flow.Runner.run, effect_targets)),
+            mock.patch.object(
+                agents_flow.Runner,
+                "run_streamed",
+                self._wrap_run_streamed(agents_flow.Runner.run_streamed, effect_targets),
+            ),
+            mock.patch.object(DiskImageCache, "set", self._wrap_effect("disk_cache.set", DiskImageCache.set)),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            yield self
+        if self.mode == "record":
+            self.save()
+
+    def unused(self) -> int:
+        """Number of recorded calls that replay has not consumed."""
+        return sum(len(queue) for queue in self._queues.values())
+
+
+async def _build_menus(cassette: Cassette, titles: list[str]) -> float:
+    from . import agents_flow
+    from .image_cache import DiskImageCache
+    from .image_index import ImageNameIndex
+    from .memory_cache import MemoryLRUCache
+    from .menu_cache import MenuCache
+    from .seed import SeedPack
+
+    # Start cold in a scratch directory so every upstream call happens, and is
+    # recorded or replayed, without touching the real caches.
+    with tempfile.TemporaryDirectory(prefix="flickfeast-cassette-") as root, contextlib.ExitStack() as stack:
+        settings = agents_flow.settings
+        scratch = {
+            "menu_cache": MenuCache(Path(root) / "menus"),
+            "disk_cache": DiskImageCache(Path(root) / "images", settings.image_variant_format),
+            "image_memory_cache": MemoryLRUCache(),
+            "image_index": ImageNameIndex(Path(root) / "image_index.txt", settings.image_similarity_threshold),
+            "seed_pack": SeedPack(),
+        }
+        for name, value in scratch.items():
+            stack.enter_context(mock.patch.object(agents_flow, name, value))
+        stack.enter_context(cassette.installed())
+        started = time.perf_counter()
+        for title in titles:
+            menu = await agents_flow.build_menu(title)
+            logger.info("Built menu for title=%s items=%s", title, len(menu.get("items", [])))
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record = subparsers.add_parser("record", help="build menus against real upstreams and record them")
+    record.add_argument("cassette", type=Path)
+    record.add_argument("titles", nargs="+")
+    replay = subparsers.add_parser("replay", help="rebuild the recorded menus from a cassette")
+    replay.add_argument("cassette", type=Path)
+    replay.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "record":
+        cassette = Cassette(args.cassette, mode="record")
+        cassette.meta = {"titles": args.titles, "recorded_at": time.time()}
+    else:
+        cassette = Cassette(args.cassette, mode="replay", latency_scale=args.latency_scale)
+    elapsed = asyncio.run(_build_menus(cassette, cassette.meta.get("titles", [])))
+    print(f"{args.command}: {len(cassette.meta.get('titles', []))} menus in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,40 @@ class Settings:
         self.spoonacular_api_key = os.getenv("SPOONACULAR_API_KEY", "")
         self.openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.openai_image_model = os.getenv("OPENAI_IMAGE_MODEL", "gpt-image-1-mini")
+        self.openai_fast_model = os.getenv("OPENAI_FAST_MODEL", "gpt-4.1-nano")
+        self.model_prices = os.getenv("MODEL_PRICES", "")
+        self.menu_budget_usd = float(os.getenv("MENU_BUDGET_USD", "0"))
+        self.rate_limit_menu_per_minute = float(os.getenv("RATE_LIMIT_MENU_PER_MINUTE", "6"))
+        self.rate_limit_menu_burst = float(os.getenv("RATE_LIMIT_MENU_BURST", "3"))
+        self.rate_limit_search_per_minute = float(os.getenv("RATE_LIMIT_SEARCH_PER_MINUTE", "60"))
+        self.rate_limit_search_burst = float(os.getenv("RATE_LIMIT_SEARCH_BURST", "20"))
+        self.max_inflight_menus = int(os.getenv("MAX_INFLIGHT_MENUS", "8"))
+        self.max_queued_menu_jobs = int(os.getenv("MAX_QUEUED_MENU_JOBS", "50"))
+        self.menu_prefetch_enabled = os.getenv("MENU_PREFETCH", "false").lower() in ("1", "true", "yes")
+        self.menu_prefetch_budget_per_hour = int(os.getenv("MENU_PREFETCH_BUDGET_PER_HOUR", "20"))
+        self.menu_latency_budget = float(os.getenv("MENU_LATENCY_BUDGET_SECONDS", "30"))
+        self.menu_degrade_after = float(os.getenv("MENU_DEGRADE_AFTER_SECONDS", "15"))
+        self.menu_degrade_after_image = float(os.getenv("MENU_DEGRADE_AFTER_IMAGE_SECONDS", "45"))
+        self.menu_degrade_after_stream = float(os.getenv("MENU_DEGRADE_AFTER_STREAM_SECONDS", "30"))
+        self.loop_monitor_enabled = os.getenv("LOOP_MONITOR", "false").lower() in ("1", "true", "yes")
+        self.loop_monitor_threshold_ms = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100"))
+        self.max_batch_titles = int(os.getenv("MAX_BATCH_TITLES", "8"))
+        self.menu_job_workers = int(os.getenv("MENU_JOB_WORKERS", "2"))
+        self.menu_job_max_attempts = int(os.getenv("MENU_JOB_MAX_ATTEMPTS", "3"))
+        self.cache_io_workers = int(os.getenv("CACHE_IO_WORKERS", "4"))
+        self.image_memory_cache = os.getenv("IMAGE_MEMORY_CACHE", "local").lower()
+        self.image_memory_cache_size = int(os.getenv("IMAGE_MEMORY_CACHE_SIZE", "100"))
+        self.image_memory_cache_slot_kb = int(os.getenv("IMAGE_MEMORY_CACHE_SLOT_KB", "3072"))
+        self.image_memory_cache_path = os.getenv(
+            "IMAGE_MEMORY_CACHE_PATH",
+            "/dev/shm/flickfeast-image-cache" if Path("/dev/shm").is_dir() else "",
+        )
+        self.image_similarity_threshold = float(os.getenv("IMAGE_SIMILARITY_THRESHOLD", "0.7"))
+        self.menu_cache_format = os.getenv("MENU_CACHE_FORMAT", "json").lower()
+        self.menu_cache_compression = os.getenv("MENU_CACHE_COMPRESSION", "none").lower()
+        self.seed_pack_path = os.getenv("SEED_PACK_PATH", "")
+        self.menu_bundle_path = os.getenv("MENU_BUNDLE_PATH", "")
+        self.image_variant_format = os.getenv("IMAGE_VARIANT_FORMAT", "webp").lower()
 
 
 settings = Settings()
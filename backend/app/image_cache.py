@@ -1,31 +1,81 @@
+import asyncio
 import base64
+import functools
 import hashlib
+import io
 import logging
+import threading
+from concurrent.futures import Executor
 from pathlib import Path
 
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; variants fall back to the original PNG.
+    Image = None
+    features = None
+
 logger = logging.getLogger(__name__)
 
+# Longest edge in pixels for each downscaled variant.
+IMAGE_VARIANTS = {"thumb": 128, "card": 384, "full": 1024}
+_VARIANT_MIME = {"webp": "image/webp", "avif": "image/avif"}
+
+
+def image_filename(key: str, variant: str | None = None, variant_format: str = "webp") -> str:
+    if variant:
+        digest = hashlib.sha256(f"{key}@{variant}".encode("utf-8")).hexdigest()
+        return f"{digest}.{variant_format}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return f"{digest}.png"
+
+
+def variant_format_for(requested: str) -> str:
+    """Return requested if this Pillow build can encode it, else webp."""
+    if requested not in _VARIANT_MIME:
+        return "webp"
+    if features is not None and requested != "webp" and not features.check(requested):
+        logger.warning("Pillow cannot encode %s; storing image variants as webp", requested)
+        return "webp"
+    return requested
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Readers on other threads must never see a half-written file.
+    tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
 
 class DiskImageCache:
-    def __init__(self, root: Path) -> None:
+    """PNG originals and downscaled variants on disk, keyed by item name.
+
+    get/set are blocking; coroutines use aget/aset, which run them on
+    executor (the loop's default executor when None).
+    """
+
+    def __init__(self, root: Path, variant_format: str = "webp", executor: Executor | None = None) -> None:
         self.root = root
         self.root.mkdir(parents=True, exist_ok=True)
+        self.variant_format = variant_format_for(variant_format)
+        self.executor = executor
 
-    def _key_path(self, key: str) -> Path:
-        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
-        return self.root / f"{digest}.png"
+    def _key_path(self, key: str, variant: str | None = None) -> Path:
+        return self.root / image_filename(key, variant, self.variant_format)
 
-    def get(self, key: str) -> str | None:
+    def has(self, key: str) -> bool:
+        return self._key_path(key).exists()
+
+    def get(self, key: str, variant: str | None = None) -> str | None:
+        if variant and variant in IMAGE_VARIANTS and Image is not None:
+            path = self._key_path(key, variant)
+            if not path.exists():
+                self._build_variants(key)
+            if path.exists():
+                return self._read_data_uri(key, path, _VARIANT_MIME[self.variant_format])
         path = self._key_path(key)
         if not path.exists():
             return None
-        try:
-            data = path.read_bytes()
-            encoded = base64.b64encode(data).decode("ascii")
-            return f"data:image/png;base64,{encoded}"
-        except OSError as exc:
-            logger.warning("Failed reading image cache for key=%s", key)
-            return None
+        return self._read_data_uri(key, path, "image/png")
 
     def set(self, key: str, data_uri: str) -> None:
         if not data_uri.startswith("data:image/png;base64,"):
@@ -34,6 +84,53 @@ class DiskImageCache:
         try:
             raw = data_uri.split(",", 1)[1]
             payload = base64.b64decode(raw)
-            path.write_bytes(payload)
+            _write_atomic(path, payload)
         except (OSError, ValueError) as exc:
             logger.warning("Failed writing image cache for key=%s", key)
+            return
+        self._write_variants(key, payload)
+
+    def _read_data_uri(self, key: str, path: Path, mime: str) -> str | None:
+        try:
+            data = path.read_bytes()
+            encoded = base64.b64encode(data).decode("ascii")
+            return f"data:{mime};base64,{encoded}"
+        except OSError as exc:
+            logger.warning("Failed reading image cache for key=%s", key)
+            return None
+
+    def _build_variants(self, key: str) -> None:
+        # Originals cached before variants existed are converted on first request.
+        path = self._key_path(key)
+        if not path.exists():
+            return
+        try:
+            payload = path.read_bytes()
+        except OSError:
+            logger.warning("Failed reading image cache for key=%s", key)
+            return
+        self._write_variants(key, payload)
+
+    def _write_variants(self, key: str, payload: bytes) -> None:
+        if Image is None:
+            return
+        try:
+            with Image.open(io.BytesIO(payload)) as original:
+                original.load()
+                for variant, edge in IMAGE_VARIANTS.items():
+                    resized = original.copy()
+                    resized.thumbnail((edge, edge))
+                    buffer = io.BytesIO()
+                    resized.save(buffer, format=self.variant_format.upper(), quality=80)
+                    _write_atomic(self._key_path(key, variant), buffer.getvalue())
+        except (OSError, ValueError, KeyError):
+            # KeyError: Pillow has no encoder registered for the format.
+            logger.warning("Failed writing image variants for key=%s", key)
+
+    async def aget(self, key: str, variant: str | None = None) -> str | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self.get, key, variant))
+
+    async def aset(self, key: str, data_uri: str) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, functools.partial(self.set, key, data_uri))
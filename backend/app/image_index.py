@@ -0,0 +1,106 @@
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _features(name: str) -> Counter[str]:
+    words = re.findall(r"[a-z0-9]+", name.lower())
+    padded = f" {' '.join(words)} "
+    features = Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+    features.update(f"w:{word}" for word in words)
+    return features
+
+
+class ImageNameIndex:
+    """Character n-gram TF-IDF index over item names that already have an image.
+
+    Names are appended to a plain text file, one per line, so the index is
+    updated incrementally and reloaded on startup. Normalized vectors are kept
+    in an inverted index by feature, rebuilt lazily after names are added, so
+    a lookup only scores names sharing an n-gram with the query. Safe to call
+    from executor threads.
+    """
+
+    def __init__(self, path: Path, threshold: float = 0.8) -> None:
+        self.path = path
+        self.threshold = threshold
+        self._names: dict[str, Counter[str]] = {}
+        self._doc_freq: Counter[str] = Counter()
+        self._postings: dict[str, list[tuple[str, float]]] | None = None
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            logger.warning("Failed reading image index at %s", self.path)
+            return
+        for line in lines:
+            self._index(line.strip())
+
+    def _index(self, name: str) -> bool:
+        if not name or name in self._names:
+            return False
+        features = _features(name)
+        self._names[name] = features
+        self._doc_freq.update(features.keys())
+        self._postings = None
+        return True
+
+    def add(self, name: str) -> None:
+        name = name.strip().lower()
+        with self._lock:
+            if not self._index(name):
+                return
+        try:
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(name + "\n")
+        except OSError:
+            logger.warning("Failed writing image index for name=%s", name)
+
+    def _weights(self, features: Counter[str]) -> dict[str, float]:
+        total = len(self._names)
+        weights = {
+            feature: count * (math.log((1 + total) / (1 + self._doc_freq[feature])) + 1)
+            for feature, count in features.items()
+        }
+        norm = math.sqrt(sum(value * value for value in weights.values())) or 1.0
+        return {feature: value / norm for feature, value in weights.items()}
+
+    def _build_postings(self) -> dict[str, list[tuple[str, float]]]:
+        postings: dict[str, list[tuple[str, float]]] = defaultdict(list)
+        for candidate, features in self._names.items():
+            for feature, weight in self._weights(features).items():
+                postings[feature].append((candidate, weight))
+        return postings
+
+    def nearest(self, name: str) -> tuple[str, float] | None:
+        """Return the most similar indexed name and its score if above the threshold."""
+        name = name.strip().lower()
+        if not name or not self._names or self.threshold <= 0:
+            return None
+        with self._lock:
+            if self._postings is None:
+                self._postings = self._build_postings()
+            postings = self._postings
+            query = self._weights(_features(name))
+        scores: Counter[str] = Counter()
+        for feature, value in query.items():
+            for candidate, weight in postings.get(feature, ()):
+                scores[candidate] += value * weight
+        best_name, best_score = "", 0.0
+        for candidate, score in scores.items():
+            if score > best_score:
+                best_name, best_score = candidate, score
+        if best_score < self.threshold:
+            return None
+        return best_name, best_score
@@ -0,0 +1,63 @@
+import time
+
+
+class LatencyTracker:
+    """Exponentially weighted moving average of upstream call latency.
+
+    Reports degraded once the average exceeds threshold seconds. An average
+    with no observation for stale_after seconds no longer counts, so one slow
+    spell does not keep menus degraded after traffic stops.
+    """
+
+    def __init__(self, threshold: float, alpha: float = 0.2, stale_after: float = 300.0) -> None:
+        self.threshold = threshold
+        self.alpha = alpha
+        self.stale_after = stale_after
+        self.average: float | None = None
+        self.updated = 0.0
+
+    def observe(self, seconds: float) -> None:
+        if self.average is None or self.stale:
+            self.average = seconds
+        else:
+            self.average = self.alpha * seconds + (1 - self.alpha) * self.average
+        self.updated = time.monotonic()
+
+    @property
+    def stale(self) -> bool:
+        return self.stale_after > 0 and time.monotonic() - self.updated > self.stale_after
+
+    @property
+    def degraded(self) -> bool:
+        return (
+            self.threshold > 0
+            and self.average is not None
+            and self.average > self.threshold
+            and not self.stale
+        )
+
+
+class StageLatency:
+    """One LatencyTracker per upstream stage, since image runs are far slower than recipes.
+
+    build_menu degrades when any stage does; stages without a threshold
+    are not tracked.
+    """
+
+    def __init__(self, thresholds: dict[str, float], alpha: float = 0.2, stale_after: float = 300.0) -> None:
+        self.trackers = {
+            stage: LatencyTracker(threshold, alpha, stale_after) for stage, threshold in thresholds.items()
+        }
+
+    def observe(self, stage: str, seconds: float) -> None:
+        tracker = self.trackers.get(stage)
+        if tracker is not None:
+            tracker.observe(seconds)
+
+    def degraded_stages(self) -> dict[str, float]:
+        """Average latency of each stage currently above its threshold."""
+        return {stage: tracker.average for stage, tracker in self.trackers.items() if tracker.degraded}
+
+    @property
+    def degraded(self) -> bool:
+        return any(tracker.degraded for tracker in self.trackers.values())
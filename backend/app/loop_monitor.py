@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_APP_ROOT = str(Path(__file__).resolve().parents[1])
+
+
+def _describe(frame: traceback.FrameSummary) -> str:
+    return f"{Path(frame.filename).name}:{frame.lineno} {frame.name}"
+
+
+class LoopMonitor:
+    """Measure event-loop lag and capture stacks of callbacks that block it.
+
+    A heartbeat task on the loop records how late each wakeup is. A watchdog
+    thread notices when the heartbeat goes stale for longer than threshold
+    and samples the loop thread's stack while it is still blocked, once per
+    stall, so the offending call is in the sample. Blocking sites are tallied
+    by their innermost frame in our code and the frame it was stuck in.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        interval: float = 0.05,
+        window: int = 1200,
+        max_samples: int = 20,
+    ) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=window)
+        self._samples: deque[dict] = deque(maxlen=max_samples)
+        self._sites: Counter[str] = Counter()
+        self._beat = 0.0
+        self._beat_count = 0
+        self._sampled_beat = -1
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # The watchdog thread records stalls while metrics() reads them on the loop.
+        self._lock = threading.Lock()
+        self.stats = {"stalls": 0, "max_lag_ms": 0.0}
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info("Event loop monitor started threshold=%.0fms", self.threshold * 1000)
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            self.stats["max_lag_ms"] = max(self.stats["max_lag_ms"], lag * 1000)
+            self._beat = now
+            self._beat_count += 1
+
+    def _watch(self) -> None:
+        poll = max(self.threshold / 4, 0.005)
+        while not self._stopping.wait(poll):
+            beat_count = self._beat_count
+            stalled = time.monotonic() - self._beat - self.interval
+            if stalled < self.threshold or beat_count == self._sampled_beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            if Path(stack[-1].filename).name == "selectors.py":
+                # Back to waiting for I/O by the time we looked; nothing to blame.
+                continue
+            self._sampled_beat = beat_count
+            self._record_stall(stalled, stack)
+
+    def _record_stall(self, stalled: float, stack: traceback.StackSummary) -> None:
+        ours = [entry for entry in stack if entry.filename.startswith(_APP_ROOT)]
+        site = _describe(ours[-1] if ours else stack[-1])
+        if ours and ours[-1] is not stack[-1]:
+            site = f"{site} -> {_describe(stack[-1])}"
+        formatted = "".join(stack.format()[-12:])
+        with self._lock:
+            self.stats["stalls"] += 1
+            self._sites[site] += 1
+            self._samples.append(
+                {"at": time.time(), "blocked_ms": round(stalled * 1000, 1), "site": site, "stack": formatted}
+            )
+        logger.warning(
+            "Event loop blocked for at least %.0fms at %s\n%s", stalled * 1000, site, formatted
+        )
+
+    def metrics(self) -> dict:
+        lags = sorted(self._lags)
+        with self._lock:
+            stalls = self.stats["stalls"]
+            sites = dict(self._sites.most_common(10))
+            samples = list(self._samples)
+        return {
+            "enabled": self._task is not None,
+            "threshold_ms": self.threshold * 1000,
+            "lag_ms": round(self._lags[-1] * 1000, 2) if self._lags else 0.0,
+            "lag_p50_ms": round(lags[len(lags) // 2] * 1000, 2) if lags else 0.0,
+            "lag_p99_ms": round(lags[int(len(lags) * 0.99) - 1] * 1000, 2) if lags else 0.0,
+            "max_lag_ms": round(self.stats["max_lag_ms"], 2),
+            "stalls": stalls,
+            "blocking_sites": sites,
+            "recent_stalls": samples,
+        }
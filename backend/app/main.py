@@ -1,25 +1,130 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, RedirectResponse
 import secrets
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from .agents_flow import build_menu
+from .agents_flow import build_menu, menu_cache, usage_report
 from .auth import (
     GoogleAuthError,
     build_google_auth_url,
+    cached_token_subject,
     exchange_code_for_token,
     verify_google_token,
 )
 from .movie_api import MovieApiError, search_movies
 from .config import settings
+from .image_cache import IMAGE_VARIANTS
+from .loop_monitor import LoopMonitor
+from .menu_jobs import MenuJobError, MenuJobQueue
+from .prefetch import MenuPrefetcher
+from .rate_limit import RateLimiter
+
+menu_jobs = MenuJobQueue(
+    Path(__file__).resolve().parents[1] / "cache" / "menu_jobs.sqlite3",
+    worker_count=settings.menu_job_workers,
+    max_attempts=settings.menu_job_max_attempts,
+)
+prefetcher = MenuPrefetcher(
+    menu_jobs,
+    enabled=settings.menu_prefetch_enabled,
+    budget_per_hour=settings.menu_prefetch_budget_per_hour,
+    max_pending_jobs=settings.max_queued_menu_jobs // 2,
+)
+_PREFETCH_WAIT_SECONDS = 120
+loop_monitor = LoopMonitor(threshold=settings.loop_monitor_threshold_ms / 1000)
+
 
-app = FastAPI(title="flickfeast")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.loop_monitor_enabled:
+        loop_monitor.start()
+    menu_jobs.start(_run_menu_job)
+    yield
+    await menu_jobs.stop()
+    await loop_monitor.stop()
+
+
+app = FastAPI(title="flickfeast", lifespan=lifespan)
 
 logger = logging.getLogger(__name__)
 
+_COST_CLASSES = {
+    ("POST", "/movies/menu"): "menu",
+    ("POST", "/movies/menu/jobs"): "menu",
+    ("POST", "/movies/menus"): "menu",
+    ("GET", "/movies/search"): "search",
+}
+_ADMISSION_RETRY_AFTER = 30
+rate_limiter = RateLimiter(
+    {
+        "menu": (settings.rate_limit_menu_per_minute, settings.rate_limit_menu_burst),
+        "search": (settings.rate_limit_search_per_minute, settings.rate_limit_search_burst),
+    }
+)
+_inflight_menus = 0
+
+
+async def _client_identity(request: Request) -> str:
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        subject = await asyncio.to_thread(cached_token_subject, authorization[7:].strip())
+        if subject:
+            return f"sub:{subject}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def _menu_capacity_exhausted(path: str, count: int = 1) -> bool:
+    if path == "/movies/menu/jobs":
+        return await menu_jobs.apending_count() >= settings.max_queued_menu_jobs
+    return _inflight_menus + count > settings.max_inflight_menus
+
+
+async def _admission_rejection(request: Request, cost_class: str, count: int = 1) -> JSONResponse | None:
+    """Return a 503/429 response if count requests of cost_class cannot be admitted now."""
+    if cost_class == "menu" and await _menu_capacity_exhausted(request.url.path, count):
+        logger.warning("Rejecting %s: menu capacity exhausted", request.url.path)
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, try again shortly"},
+            headers={"Retry-After": str(_ADMISSION_RETRY_AFTER)},
+        )
+    client = await _client_identity(request)
+    retry_after = rate_limiter.check(client, cost_class, cost=count)
+    if retry_after:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={"Retry-After": str(retry_after)},
+        )
+    return None
+
+
+# Registered before CORS so that 429/503 responses still carry CORS headers.
+@app.middleware("http")
+async def rate_limit(request: Request, call_next):
+    global _inflight_menus
+    cost_class = _COST_CLASSES.get((request.method, request.url.path))
+    if cost_class is None or request.url.path == "/movies/menus":
+        # Batches are admitted per title once the body is parsed; see movie_menus.
+        return await call_next(request)
+    rejection = await _admission_rejection(request, cost_class)
+    if rejection is not None:
+        return rejection
+    if request.url.path != "/movies/menu":
+        return await call_next(request)
+    _inflight_menus += 1
+    try:
+        return await call_next(request)
+    finally:
+        _inflight_menus -= 1
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins,
@@ -35,6 +140,7 @@ class GoogleTokenRequest(BaseModel):
 
 class MovieRequest(BaseModel):
     title: str
+    image_variant: str | None = None
 
 
 class MovieSearchResponse(BaseModel):
@@ -48,6 +154,7 @@ class MenuItemResponse(BaseModel):
     name: str
     reason: str
     image_data: str | None = None
+    pending: list[str] = []
 
 
 class RecipeResponse(BaseModel):
@@ -63,6 +170,32 @@ class MenuResponse(BaseModel):
     notes: str | None = None
 
 
+class BatchMenuRequest(BaseModel):
+    titles: list[str]
+    image_variant: str | None = None
+
+
+class BatchMenuEntry(BaseModel):
+    title: str
+    items: list[MenuItemResponse] = []
+    notes: str | None = None
+    error: str | None = None
+
+
+class BatchMenuResponse(BaseModel):
+    menus: list[BatchMenuEntry]
+
+
+class MenuJobResponse(BaseModel):
+    id: str
+    title: str
+    status: str
+    attempts: int = 0
+    progress: dict = {}
+    error: str | None = None
+    menu: MenuResponse | None = None
+
+
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
@@ -122,8 +255,11 @@ async def movie_menu(payload: MovieRequest) -> dict[str, list[dict[str, str]] |
     title = payload.title.strip()
     if not title:
         raise HTTPException(status_code=400, detail="Movie title is required")
+    if payload.image_variant and payload.image_variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Unknown image variant")
 
-    menu = await build_menu(title)
+    await _await_prefetch(title)
+    menu = await build_menu(title, image_variant=payload.image_variant)
     if not menu.get("items"):
         detail = menu.get("notes", "Menu generation failed")
         logger.warning("No menu items found for title=%s detail=%s", title, detail)
@@ -134,13 +270,127 @@ async def movie_menu(payload: MovieRequest) -> dict[str, list[dict[str, str]] |
     return menu
 
 
+def _max_batch_titles() -> int:
+    """Largest batch that can ever be admitted: one token and one in-flight slot per title."""
+    limit = min(settings.max_batch_titles, settings.max_inflight_menus)
+    if settings.rate_limit_menu_per_minute > 0:
+        limit = min(limit, int(settings.rate_limit_menu_burst))
+    return max(limit, 1)
+
+
+@app.post("/movies/menus", response_model=BatchMenuResponse)
+async def movie_menus(payload: BatchMenuRequest, request: Request) -> dict[str, list[dict]]:
+    global _inflight_menus
+    titles: list[str] = []
+    seen: set[str] = set()
+    for title in payload.titles:
+        title = title.strip()
+        if title and title.lower() not in seen:
+            seen.add(title.lower())
+            titles.append(title)
+    if not titles:
+        raise HTTPException(status_code=400, detail="At least one movie title is required")
+    max_titles = _max_batch_titles()
+    if len(titles) > max_titles:
+        raise HTTPException(status_code=400, detail=f"At most {max_titles} titles per request")
+    if payload.image_variant and payload.image_variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Unknown image variant")
+
+    # Each title costs a menu rate-limit token and an in-flight slot.
+    rejection = await _admission_rejection(request, "menu", len(titles))
+    if rejection is not None:
+        return rejection
+    _inflight_menus += len(titles)
+    try:
+        # Menus run concurrently; build_menu coalesces image and recipe work for
+        # identical item names, and item_results keeps finished work for the
+        # rest of the batch, so shared dishes are only generated once.
+        item_results: dict = {}
+        menus = await asyncio.gather(
+            *(
+                build_menu(title, image_variant=payload.image_variant, item_results=item_results)
+                for title in titles
+            )
+        )
+    finally:
+        _inflight_menus -= len(titles)
+    entries = []
+    for title, menu in zip(titles, menus, strict=True):
+        entry = {"title": title, **menu}
+        if not menu.get("items"):
+            logger.warning("No menu items found for title=%s detail=%s", title, menu.get("notes"))
+            entry["error"] = menu.get("notes") or "Menu generation failed"
+        entries.append(entry)
+    return {"menus": entries}
+
+
 @app.get("/movies/search", response_model=list[MovieSearchResponse])
-async def movie_search(query: str) -> list[dict[str, str]]:
+async def movie_search(query: str, request: Request) -> list[dict[str, str]]:
     query = query.strip()
     if not query:
         return []
     try:
-        return search_movies(query)
+        results = search_movies(query)
     except MovieApiError as exc:
         logger.exception("Movie search failed for query=%s", query)
         raise HTTPException(status_code=502, detail=str(exc)) from exc
+    if prefetcher.enabled and results and not await menu_cache.ahas(results[0]["title"]):
+        menu_jobs.start(_run_menu_job)
+        await prefetcher.aprefetch(await _client_identity(request), results[0]["title"])
+    return results
+
+
+async def _await_prefetch(title: str) -> None:
+    """Wait for a running speculative build of title so its result is reused."""
+    job = await prefetcher.aclaim(title)
+    if job is None:
+        return
+    deadline = asyncio.get_running_loop().time() + _PREFETCH_WAIT_SECONDS
+    while job and job["status"] == "running":
+        if asyncio.get_running_loop().time() > deadline:
+            return
+        await asyncio.sleep(0.25)
+        job = await menu_jobs.aget(job["id"])
+
+
+@app.get("/metrics/prefetch")
+async def prefetch_metrics() -> dict[str, float | int | bool]:
+    return prefetcher.metrics()
+
+
+@app.get("/metrics/loop")
+async def loop_metrics() -> dict:
+    return loop_monitor.metrics()
+
+
+@app.get("/metrics/usage")
+async def usage_metrics() -> dict:
+    return usage_report.report()
+
+
+async def _run_menu_job(title: str, report) -> None:
+    menu = await build_menu(title, on_progress=report)
+    if not menu.get("items"):
+        detail = menu.get("notes", "Menu generation failed")
+        raise MenuJobError(str(detail), retry="not found" not in str(detail).lower())
+
+
+@app.post("/movies/menu/jobs", response_model=MenuJobResponse, status_code=202)
+async def create_menu_job(payload: MovieRequest) -> dict:
+    title = payload.title.strip()
+    if not title:
+        raise HTTPException(status_code=400, detail="Movie title is required")
+
+    menu_jobs.start(_run_menu_job)
+    await prefetcher.aclaim(title, reuse_queued=True)
+    return await menu_jobs.aenqueue(title)
+
+
+@app.get("/movies/menu/jobs/{job_id}", response_model=MenuJobResponse)
+async def get_menu_job(job_id: str) -> dict:
+    job = await menu_jobs.aget(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Menu job not found")
+    if job["status"] == "done":
+        job["menu"] = await menu_cache.aget(job["title"])
+    return job
@@ -0,0 +1,221 @@
+import errno
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryLRUCache:
+    """Per-process LRU cache of string values."""
+
+    def __init__(self, max_items: int = 100) -> None:
+        self.max_items = max_items
+        self._items: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def _allocate(fd: int, size: int) -> bool:
+    """Reserve size bytes of backing store for fd; False if the filesystem is full.
+
+    A sparse file on a full tmpfs raises SIGBUS on the first write to an
+    unbacked page, so the space is claimed up front where supported.
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return True
+        except OSError as exc:
+            if exc.errno == errno.ENOSPC:
+                return False
+            if exc.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    os.ftruncate(fd, size)
+    return True
+
+
+_FILE_MAGIC = b"FFSHM001"
+_FILE_HEADER = struct.Struct("<8sII")
+_FILE_HEADER_SIZE = 64
+# state, key length, key digest, last access (epoch seconds), value length
+_SLOT_HEADER = struct.Struct("<B3xI8sdI")
+_SLOT_EMPTY = 0
+_SLOT_USED = 1
+
+
+class SharedMemoryCache:
+    """Cross-process cache of string values in a memory-mapped file.
+
+    The file is a fixed-slot hash table: each key hashes to a slot and probes
+    up to probe_limit neighbours. On insert, an empty or matching slot is
+    reused, otherwise the least recently used slot in the probe window is
+    evicted. Values larger than a slot are not cached. Every worker on a node
+    maps the same file (ideally under /dev/shm), and access is serialised
+    with flock.
+
+    The file name carries the slot layout, so workers started with a
+    different size or slot size use their own file instead of resizing one
+    that others have mapped. The file is preallocated; if the filesystem
+    cannot hold it (e.g. a small tmpfs), the cache falls back to a
+    per-process MemoryLRUCache rather than faulting on a later write.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        slot_count: int = 128,
+        slot_size: int = 3 * 1024 * 1024,
+        probe_limit: int = 8,
+    ) -> None:
+        self.path = path.with_name(f"{path.name}.{slot_count}x{slot_size}")
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.probe_limit = min(probe_limit, slot_count)
+        self._pid: int | None = None
+        self._fd = -1
+        self._map: mmap.mmap | None = None
+        self._fallback: MemoryLRUCache | None = None
+
+    def _open(self) -> mmap.mmap | None:
+        """Map the cache file, or return None once the cache has fallen back to local memory."""
+        if self._fallback is not None:
+            return None
+        # Reopen after fork so each worker holds its own flock file description.
+        if self._map is not None and self._pid == os.getpid():
+            return self._map
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        size = _FILE_HEADER_SIZE + self.slot_count * self.slot_size
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            header = os.pread(self._fd, _FILE_HEADER.size, 0)
+            expected = _FILE_HEADER.pack(_FILE_MAGIC, self.slot_count, self.slot_size)
+            if header != expected:
+                if os.fstat(self._fd).st_size:
+                    # Not ours or corrupt, and possibly mapped elsewhere: never shrink it in place.
+                    logger.warning("Replacing unrecognized shared memory cache at %s", self.path)
+                    os.unlink(self.path)
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    os.close(self._fd)
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                logger.info("Initializing shared memory cache at %s", self.path)
+                if not _allocate(self._fd, size):
+                    logger.warning(
+                        "No space for a %s MB shared memory cache at %s; using a per-process cache",
+                        size // (1024 * 1024),
+                        self.path,
+                    )
+                    os.ftruncate(self._fd, 0)
+                    self._fallback = MemoryLRUCache(self.slot_count)
+                    return None
+                os.pwrite(self._fd, expected, 0)
+            self._map = mmap.mmap(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            if self._fallback is not None:
+                os.close(self._fd)
+                self._fd = -1
+        return self._map
+
+    def _slot_offset(self, index: int) -> int:
+        return _FILE_HEADER_SIZE + index * self.slot_size
+
+    def _probe(self, key: bytes) -> tuple[bytes, list[int]]:
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        start = int.from_bytes(digest, "little") % self.slot_count
+        return digest, [(start + step) % self.slot_count for step in range(self.probe_limit)]
+
+    def _find(self, mapped: mmap.mmap, key: bytes, digest: bytes, slots: list[int]) -> int | None:
+        for index in slots:
+            offset = self._slot_offset(index)
+            state, key_length, slot_digest, _, _ = _SLOT_HEADER.unpack_from(mapped, offset)
+            if state != _SLOT_USED or slot_digest != digest or key_length != len(key):
+                continue
+            key_start = offset + _SLOT_HEADER.size
+            if mapped[key_start : key_start + key_length] == key:
+                return index
+        return None
+
+    def get(self, key: str) -> str | None:
+        mapped = self._open()
+        if mapped is None:
+            return self._fallback.get(key)
+        encoded_key = key.encode("utf-8")
+        digest, slots = self._probe(encoded_key)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            index = self._find(mapped, encoded_key, digest, slots)
+            if index is None:
+                return None
+            offset = self._slot_offset(index)
+            state, key_length, _, _, value_length = _SLOT_HEADER.unpack_from(mapped, offset)
+            _SLOT_HEADER.pack_into(mapped, offset, state, key_length, digest, time.time(), value_length)
+            value_start = offset + _SLOT_HEADER.size + key_length
+            value = mapped[value_start : value_start + value_length]
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return value.decode("utf-8")
+
+    def set(self, key: str, value: str) -> None:
+        encoded_key = key.encode("utf-8")
+        encoded_value = value.encode("utf-8")
+        if _SLOT_HEADER.size + len(encoded_key) + len(encoded_value) > self.slot_size:
+            logger.debug("Value too large for shared memory cache key=%s", key)
+            return
+        mapped = self._open()
+        if mapped is None:
+            self._fallback.set(key, value)
+            return
+        digest, slots = self._probe(encoded_key)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            index = self._find(mapped, encoded_key, digest, slots)
+            if index is None:
+                index = min(slots, key=lambda slot: self._last_access(mapped, slot))
+            offset = self._slot_offset(index)
+            _SLOT_HEADER.pack_into(mapped, offset, _SLOT_EMPTY, 0, b"\0" * 8, 0.0, 0)
+            key_start = offset + _SLOT_HEADER.size
+            value_start = key_start + len(encoded_key)
+            mapped[key_start:value_start] = encoded_key
+            mapped[value_start : value_start + len(encoded_value)] = encoded_value
+            _SLOT_HEADER.pack_into(
+                mapped, offset, _SLOT_USED, len(encoded_key), digest, time.time(), len(encoded_value)
+            )
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _last_access(self, mapped: mmap.mmap, index: int) -> float:
+        state, _, _, last_access, _ = _SLOT_HEADER.unpack_from(mapped, self._slot_offset(index))
+        return last_access if state == _SLOT_USED else -1.0
+
+    def __len__(self) -> int:
+        mapped = self._open()
+        if mapped is None:
+            return len(self._fallback)
+        return sum(
+            1
+            for index in range(self.slot_count)
+            if _SLOT_HEADER.unpack_from(mapped, self._slot_offset(index))[0] == _SLOT_USED
+        )
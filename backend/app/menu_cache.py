@@ -1,33 +1,163 @@
+import asyncio
+import functools
 import json
 import logging
+import marshal
 import re
+import threading
+import zlib
+from concurrent.futures import Executor
 from pathlib import Path
 
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; the format is unavailable without it.
+    msgpack = None
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:  # zstd is optional; fall back to zlib or no compression.
+        zstd = None
+
 logger = logging.getLogger(__name__)
 
+# Files written in a non-default format start with this header followed by one
+# serializer byte and one compression byte. Plain compact JSON has no header,
+# so files from older versions (pretty-printed JSON) still load.
+_MAGIC = b"FFM1"
+_SERIALIZERS = {"json": 0, "marshal": 1, "msgpack": 2}
+_COMPRESSIONS = {"none": 0, "zlib": 1, "zstd": 2}
+_SERIALIZER_NAMES = {value: name for name, value in _SERIALIZERS.items()}
+_COMPRESSION_NAMES = {value: name for name, value in _COMPRESSIONS.items()}
+_DECODE_ERRORS: tuple[type[Exception], ...] = (ValueError, EOFError, TypeError, zlib.error)
+if zstd is not None:
+    _DECODE_ERRORS += (zstd.ZstdError,)
+
+
+def safe_key(key: str) -> str:
+    return re.sub(r"[^a-z0-9_-]+", "-", key.lower()).strip("-")
+
+
+def available_formats() -> tuple[list[str], list[str]]:
+    serializers = [name for name in _SERIALIZERS if name != "msgpack" or msgpack is not None]
+    compressions = [name for name in _COMPRESSIONS if name != "zstd" or zstd is not None]
+    return serializers, compressions
+
+
+def _dump(payload: dict, serializer: str) -> bytes:
+    if serializer == "marshal":
+        return marshal.dumps(payload)
+    if serializer == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+
+
+def _load(data: bytes, serializer: str) -> dict:
+    if serializer == "marshal":
+        return marshal.loads(data)
+    if serializer == "msgpack":
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(data, 1)
+    if compression == "zstd":
+        return zstd.compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zlib":
+        return zlib.decompress(data)
+    if compression == "zstd":
+        return zstd.decompress(data)
+    return data
+
+
+def encode_menu(payload: dict, serializer: str = "json", compression: str = "none") -> bytes:
+    body = _compress(_dump(payload, serializer), compression)
+    if serializer == "json" and compression == "none":
+        return body
+    header = _MAGIC + bytes([_SERIALIZERS[serializer], _COMPRESSIONS[compression]])
+    return header + body
+
+
+def decode_menu(data: bytes) -> dict:
+    if not data.startswith(_MAGIC):
+        return json.loads(data)
+    serializer = _SERIALIZER_NAMES.get(data[len(_MAGIC)])
+    compression = _COMPRESSION_NAMES.get(data[len(_MAGIC) + 1])
+    if serializer is None or compression is None:
+        raise ValueError("Unknown menu cache format")
+    return _load(_decompress(data[len(_MAGIC) + 2 :], compression), serializer)
+
 
 class MenuCache:
-    def __init__(self, root: Path) -> None:
+    """Menus on disk, one file per title.
+
+    get/set are blocking; coroutines use aget/aset, which run them (decoding
+    and encoding included) on executor, or the loop's default executor.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        serializer: str = "json",
+        compression: str = "none",
+        executor: Executor | None = None,
+    ) -> None:
         self.root = root
+        self.executor = executor
         self.root.mkdir(parents=True, exist_ok=True)
+        serializers, compressions = available_formats()
+        if serializer not in serializers:
+            logger.warning("Menu cache format=%s unavailable, using json", serializer)
+            serializer = "json"
+        if compression not in compressions:
+            logger.warning("Menu cache compression=%s unavailable, using none", compression)
+            compression = "none"
+        self.serializer = serializer
+        self.compression = compression
 
     def _key_path(self, key: str) -> Path:
-        safe = re.sub(r"[^a-z0-9_-]+", "-", key.lower()).strip("-")
-        return self.root / f"{safe}.json"
+        # The suffix stays .json for every format so existing entries keep their paths.
+        return self.root / f"{safe_key(key)}.json"
+
+    def has(self, key: str) -> bool:
+        return self._key_path(key).exists()
 
     def get(self, key: str) -> dict | None:
         path = self._key_path(key)
         if not path.exists():
             return None
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
+            return decode_menu(path.read_bytes())
+        except (OSError, *_DECODE_ERRORS):
             logger.warning("Failed reading menu cache for key=%s", key)
             return None
 
     def set(self, key: str, payload: dict) -> None:
         path = self._key_path(key)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
         try:
-            path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+            tmp_path.write_bytes(encode_menu(payload, self.serializer, self.compression))
+            tmp_path.replace(path)
         except OSError:
             logger.warning("Failed writing menu cache for key=%s", key)
+
+    async def ahas(self, key: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self.has, key))
+
+    async def aget(self, key: str) -> dict | None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(self.get, key))
+
+    async def aset(self, key: str, payload: dict) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, functools.partial(self.set, key, payload))
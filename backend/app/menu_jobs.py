@@ -0,0 +1,336 @@
+import asyncio
+import functools
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[dict], None]
+JobHandler = Callable[[str, ProgressCallback], Awaitable[None]]
+
+
+class MenuJobError(Exception):
+    def __init__(self, message: str, retry: bool = True) -> None:
+        super().__init__(message)
+        self.retry = retry
+
+
+class _ProgressWriter:
+    """Coalesces a running job's progress reports into one pending write.
+
+    Reports arriving within interval of each other, or while a write is in
+    flight, only keep the latest progress; close() writes whatever is left.
+    """
+
+    def __init__(self, queue: "MenuJobQueue", job_id: str, interval: float) -> None:
+        self.queue = queue
+        self.job_id = job_id
+        self.interval = interval
+        self._latest: dict | None = None
+        self._task: asyncio.Task | None = None
+        self._closed = asyncio.Event()
+
+    def __call__(self, progress: dict) -> None:
+        self._latest = progress
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush())
+
+    async def _flush(self) -> None:
+        try:
+            await asyncio.wait_for(self._closed.wait(), timeout=self.interval)
+        except TimeoutError:
+            pass
+        while self._latest is not None:
+            progress, self._latest = self._latest, None
+            try:
+                await self.queue._call(self.queue.report, self.job_id, progress)
+            except sqlite3.Error:
+                logger.warning("Failed saving progress for menu job id=%s", self.job_id)
+
+    async def close(self) -> None:
+        self._closed.set()
+        if self._task is not None:
+            await self._task
+
+
+class MenuJobQueue:
+    """SQLite-backed queue of menu builds, drained by in-process asyncio workers.
+
+    Running jobs hold a lease; if a process dies mid-build, the job becomes
+    claimable again once the lease expires, so several app processes can share
+    one database file. The database is created on first use. Workers and the
+    a-prefixed methods run queries on a single-thread executor so the event
+    loop never waits on SQLite locks.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        worker_count: int = 2,
+        max_attempts: int = 3,
+        lease_seconds: float = 600.0,
+        poll_interval: float = 1.0,
+        progress_interval: float = 0.5,
+        executor: Executor | None = None,
+    ) -> None:
+        self.path = path
+        self.worker_count = worker_count
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="menu-jobs")
+        self._workers: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _ensure_schema(self) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._create_schema()
+            self._schema_ready = True
+
+    def _create_schema(self) -> None:
+        with self._open() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    progress TEXT NOT NULL DEFAULT '{}',
+                    error TEXT NOT NULL DEFAULT '',
+                    lease_until REAL NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "priority" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_title_key ON jobs (title_key, status)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self._ensure_schema()
+        with self._open() as conn:
+            yield conn
+
+    @contextmanager
+    def _open(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _title_key(title: str) -> str:
+        return re.sub(r"\s+", " ", title.strip().lower())
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "attempts": row["attempts"],
+            "progress": json.loads(row["progress"] or "{}"),
+            "error": row["error"] or None,
+        }
+
+    def enqueue(self, title: str, priority: int = 0) -> dict:
+        """Queue a build for title, or return the queued/running job for the same title.
+
+        Higher priority jobs are claimed first; re-enqueueing an active job at a
+        higher priority promotes it.
+        """
+        title_key = self._title_key(title)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE title_key = ? AND status IN ('queued', 'running') "
+                "ORDER BY created_at LIMIT 1",
+                (title_key,),
+            ).fetchone()
+            if row is None:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, title, title_key, status, priority, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                    (job_id, title, title_key, priority, now, now),
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            elif priority > row["priority"]:
+                conn.execute(
+                    "UPDATE jobs SET priority = ?, updated_at = ? WHERE id = ?",
+                    (priority, now, row["id"]),
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+        self._notify()
+        return self._row_to_job(row)
+
+    def _notify(self) -> None:
+        # enqueue() may run on the executor thread; asyncio.Event is not thread-safe.
+        if self._wakeup is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def get(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def pending_count(self) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        return row[0]
+
+    def claim(self) -> dict | None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # A job whose lease keeps expiring may be what takes the process down.
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, lease_until = 0, updated_at = ? "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (f"Lease expired after {self.max_attempts} attempts", now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY priority DESC, created_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                    "lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + self.lease_seconds, now, row["id"]),
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+        return self._row_to_job(row) if row else None
+
+    def report(self, job_id: str, progress: dict) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), now + self.lease_seconds, now, job_id),
+            )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started yet; return whether it was cancelled."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount > 0
+
+    def release(self, job_id: str) -> None:
+        """Requeue a running job this process stopped working on, without spending an attempt."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = MAX(attempts - 1, 0), lease_until = 0, "
+                "updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, status: str, error: str = "") -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = 0, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    async def _call(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args))
+
+    async def aenqueue(self, title: str, priority: int = 0) -> dict:
+        return await self._call(self.enqueue, title, priority)
+
+    async def aget(self, job_id: str) -> dict | None:
+        return await self._call(self.get, job_id)
+
+    async def apending_count(self) -> int:
+        return await self._call(self.pending_count)
+
+    async def _run_job(self, job: dict, handler: JobHandler) -> None:
+        progress = _ProgressWriter(self, job["id"], self.progress_interval)
+        try:
+            await handler(job["title"], progress)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back now rather than leaving its lease to expire.
+            await progress.close()
+            await self._call(self.release, job["id"])
+            logger.info("Released menu job id=%s on shutdown", job["id"])
+            raise
+        except Exception as exc:
+            await progress.close()
+            retry = exc.retry if isinstance(exc, MenuJobError) else True
+            if not isinstance(exc, MenuJobError):
+                logger.exception("Menu job failed id=%s title=%s", job["id"], job["title"])
+            if retry and job["attempts"] < self.max_attempts:
+                logger.warning("Retrying menu job id=%s attempt=%s", job["id"], job["attempts"])
+                await self._call(self.finish, job["id"], "queued", str(exc))
+            else:
+                await self._call(self.finish, job["id"], "failed", str(exc))
+            return
+        await progress.close()
+        await self._call(self.finish, job["id"], "done")
+
+    async def _worker(self, handler: JobHandler) -> None:
+        while True:
+            self._wakeup.clear()
+            job = await self._call(self.claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except TimeoutError:
+                    pass
+                continue
+            await self._run_job(job, handler)
+
+    def start(self, handler: JobHandler) -> None:
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._workers = [
+            asyncio.create_task(self._worker(handler)) for _ in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+        self._loop = None
@@ -0,0 +1,124 @@
+import asyncio
+import functools
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+
+from .menu_jobs import MenuJobQueue
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_PRIORITY = -10
+
+
+class MenuPrefetcher:
+    """Speculatively queue low-priority menu builds for top search results.
+
+    Each client has at most one outstanding prefetch; a newer search cancels
+    the previous one if it has not started. Prefetches are capped per hour and
+    skipped while the job queue is busy. Hits are counted when a later menu
+    request names a prefetched title.
+    """
+
+    def __init__(
+        self,
+        queue: MenuJobQueue,
+        enabled: bool = False,
+        budget_per_hour: int = 20,
+        max_pending_jobs: int = 25,
+        max_tracked: int = 1000,
+    ) -> None:
+        self.queue = queue
+        self.enabled = enabled
+        self.budget_per_hour = budget_per_hour
+        self.max_pending_jobs = max_pending_jobs
+        self.max_tracked = max_tracked
+        self._issued: deque[float] = deque()
+        self._by_title: OrderedDict[str, str] = OrderedDict()
+        self._by_client: dict[str, tuple[str, str]] = {}
+        self.stats = {
+            "enqueued": 0,
+            "hits": 0,
+            "cancelled": 0,
+            "skipped_budget": 0,
+            "skipped_busy": 0,
+        }
+
+    @staticmethod
+    def _title_key(title: str) -> str:
+        return re.sub(r"\s+", " ", title.strip().lower())
+
+    def _within_budget(self) -> bool:
+        cutoff = time.monotonic() - 3600
+        while self._issued and self._issued[0] < cutoff:
+            self._issued.popleft()
+        return len(self._issued) < self.budget_per_hour
+
+    def prefetch(self, client: str, title: str) -> str | None:
+        """Queue a speculative build of title for client; return the job ID if queued."""
+        title_key = self._title_key(title)
+        if not self.enabled or not title_key:
+            return None
+        previous = self._by_client.get(client)
+        if previous and previous[0] == title_key:
+            return previous[1]
+        if previous and self.queue.cancel(previous[1]):
+            self.stats["cancelled"] += 1
+            self._by_title.pop(previous[0], None)
+        if not self._within_budget():
+            self.stats["skipped_budget"] += 1
+            return None
+        if self.queue.pending_count() >= self.max_pending_jobs:
+            self.stats["skipped_busy"] += 1
+            return None
+        job = self.queue.enqueue(title, priority=PREFETCH_PRIORITY)
+        if job["priority"] != PREFETCH_PRIORITY:
+            # Already queued by a real request; nothing speculative to track.
+            return None
+        self._issued.append(time.monotonic())
+        self.stats["enqueued"] += 1
+        self._by_client[client] = (title_key, job["id"])
+        self._by_title[title_key] = job["id"]
+        if len(self._by_title) > self.max_tracked:
+            self._by_title.popitem(last=False)
+        if len(self._by_client) > self.max_tracked:
+            self._by_client.pop(next(iter(self._by_client)))
+        logger.info("Prefetching menu for title=%s job=%s", title, job["id"])
+        return job["id"]
+
+    def claim(self, title: str, reuse_queued: bool = False) -> dict | None:
+        """Record a real request for title and return its prefetch job if usable.
+
+        A prefetch that has not started is cancelled unless reuse_queued is set,
+        so the caller can build in the foreground instead of waiting in line.
+        """
+        job_id = self._by_title.pop(self._title_key(title), None)
+        job = self.queue.get(job_id) if job_id else None
+        if job is None or job["status"] in ("failed", "cancelled"):
+            return None
+        if job["status"] == "queued" and not reuse_queued:
+            if self.queue.cancel(job_id):
+                self.stats["cancelled"] += 1
+            return None
+        self.stats["hits"] += 1
+        return job
+
+    async def aprefetch(self, client: str, title: str) -> str | None:
+        return await self._call(self.prefetch, client, title)
+
+    async def aclaim(self, title: str, reuse_queued: bool = False) -> dict | None:
+        return await self._call(self.claim, title, reuse_queued)
+
+    async def _call(self, fn, *args):
+        # The queue's single-thread executor also serializes our bookkeeping.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.queue.executor, functools.partial(fn, *args))
+
+    def metrics(self) -> dict[str, float | int | bool]:
+        enqueued = self.stats["enqueued"]
+        return {
+            "enabled": self.enabled,
+            **self.stats,
+            "hit_rate": self.stats["hits"] / enqueued if enqueued else 0.0,
+        }
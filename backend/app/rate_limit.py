@@ -0,0 +1,51 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """Consume cost tokens; return 0 if granted, else seconds until it would be."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-client token buckets, one per endpoint cost class.
+
+    Cost classes map to (requests per minute, burst). Buckets for idle clients
+    are evicted least-recently-used once max_clients is reached.
+    """
+
+    def __init__(self, cost_classes: dict[str, tuple[float, float]], max_clients: int = 10000) -> None:
+        self.cost_classes = cost_classes
+        self.max_clients = max_clients
+        self._buckets: OrderedDict[tuple[str, str], TokenBucket] = OrderedDict()
+
+    def check(self, client: str, cost_class: str, cost: float = 1.0) -> int:
+        """Return 0 if a request costing cost tokens is allowed, else a Retry-After value in seconds."""
+        per_minute, burst = self.cost_classes[cost_class]
+        if per_minute <= 0:
+            return 0
+        key = (client, cost_class)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(per_minute / 60.0, burst)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        wait = bucket.take(cost)
+        return math.ceil(wait) if wait else 0
@@ -0,0 +1,91 @@
+import base64
+import functools
+import json
+import logging
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from .bundle import MenuBundle
+from .config import settings
+from .image_cache import IMAGE_VARIANTS, image_filename, variant_format_for
+
+# Read-only replica app: serves menus and images from a prebuilt bundle
+# (see bundle.py) and never imports the agents/OpenAI stack.
+#   MENU_BUNDLE_PATH=flickfeast.bundle uvicorn backend.app.readonly:app
+
+app = FastAPI(title="flickfeast-readonly")
+
+logger = logging.getLogger(__name__)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.allowed_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"]
+)
+
+_VARIANT_FORMAT = variant_format_for(settings.image_variant_format)
+_IMAGE_MEDIA_TYPES = {".png": "image/png", ".webp": "image/webp", ".avif": "image/avif"}
+
+
+class MovieRequest(BaseModel):
+    title: str
+    image_variant: str | None = None
+
+
+@functools.cache
+def get_bundle() -> MenuBundle:
+    if not settings.menu_bundle_path:
+        raise HTTPException(status_code=503, detail="MENU_BUNDLE_PATH is not configured")
+    logger.info("Serving menus from bundle=%s", settings.menu_bundle_path)
+    return MenuBundle(Path(settings.menu_bundle_path))
+
+
+def _image_file(name: str, variant: str | None) -> str:
+    return image_filename(name.strip().lower(), variant, _VARIANT_FORMAT)
+
+
+@app.get("/health")
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@app.post("/movies/menu")
+async def movie_menu(payload: MovieRequest) -> Response:
+    title = payload.title.strip()
+    if not title:
+        raise HTTPException(status_code=400, detail="Movie title is required")
+    if payload.image_variant and payload.image_variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Unknown image variant")
+
+    bundle = get_bundle()
+    data = bundle.menu(title)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Menu not available")
+    if not payload.image_variant:
+        return Response(content=data, media_type="application/json")
+
+    menu = json.loads(bytes(data))
+    for item in menu.get("items", []):
+        filename = _image_file(item.get("name", ""), payload.image_variant)
+        image = bundle.image(filename)
+        if image is not None:
+            encoded = base64.b64encode(image).decode("ascii")
+            item["image_data"] = f"data:{_IMAGE_MEDIA_TYPES[Path(filename).suffix]};base64,{encoded}"
+    return Response(content=json.dumps(menu), media_type="application/json")
+
+
+@app.get("/images/{name}")
+async def menu_image(name: str, variant: str | None = None) -> Response:
+    if variant and variant not in IMAGE_VARIANTS:
+        raise HTTPException(status_code=400, detail="Unknown image variant")
+    filename = _image_file(name, variant)
+    image = get_bundle().image(filename)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Image not available")
+    return Response(content=image, media_type=_IMAGE_MEDIA_TYPES[Path(filename).suffix])
@@ -0,0 +1,152 @@
+"""Versioned seed packs of canonical recipes and images for popular menu items.
+
+A pack is a directory named by version containing manifest.json and the
+item images. build_menu consults the newest pack before any agent call.
+
+Usage:
+    python -m backend.app.seed --top 25
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import shutil
+import time
+from collections import Counter
+from pathlib import Path
+
+from .image_cache import image_filename
+from .menu_cache import MenuCache
+
+logger = logging.getLogger(__name__)
+
+SEED_ROOT = Path(__file__).resolve().parents[1] / "seed"
+
+
+class SeedPack:
+    def __init__(self, root: Path | None = None, manifest: dict | None = None) -> None:
+        self.root = root
+        manifest = manifest or {}
+        self.version = manifest.get("version", "")
+        self.items: dict[str, dict] = manifest.get("items", {})
+
+    @classmethod
+    def load(cls, path: Path) -> "SeedPack":
+        """Load the pack at path, or the newest version directory under it."""
+        if not (path / "manifest.json").exists():
+            versions = sorted(
+                version
+                for version in path.glob("*")
+                if not version.name.startswith(".") and (version / "manifest.json").exists()
+            )
+            if not versions:
+                return cls()
+            path = versions[-1]
+        try:
+            manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Failed reading seed pack at %s", path)
+            return cls()
+        logger.info(
+            "Loaded seed pack version=%s items=%s",
+            manifest.get("version"),
+            len(manifest.get("items", {})),
+        )
+        return cls(path, manifest)
+
+    def recipe(self, item_name: str) -> dict | None:
+        entry = self.items.get(item_name.strip().lower())
+        return entry.get("recipe") if entry else None
+
+    def has_image(self, item_name: str) -> bool:
+        entry = self.items.get(item_name.strip().lower())
+        return bool(entry and entry.get("image") and self.root is not None)
+
+    def image(self, item_name: str) -> str | None:
+        """Read the item's image as a data URI; blocking, so call it off the event loop."""
+        if not self.has_image(item_name):
+            return None
+        entry = self.items[item_name.strip().lower()]
+        try:
+            data = (self.root / entry["image"]).read_bytes()
+        except OSError:
+            logger.warning("Failed reading seed image for item=%s", item_name)
+            return None
+        return f"data:image/png;base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def is_placeholder_recipe(recipe: dict | None) -> bool:
+    """Whether recipe is the generic stand-in from agents_flow._fallback_recipe."""
+    if not recipe:
+        return False
+    ingredients = recipe.get("ingredients") or []
+    steps = recipe.get("steps") or []
+    return bool(ingredients) and ingredients[0].endswith(" base ingredient") and any(
+        step.startswith("Cook until done") for step in steps
+    )
+
+
+def tally_items(menu_cache: MenuCache) -> tuple[Counter[str], dict[str, dict]]:
+    """Count item names across cached menus and keep one example item per name."""
+    counts: Counter[str] = Counter()
+    examples: dict[str, dict] = {}
+    for path in sorted(menu_cache.root.glob("*.json")):
+        menu = menu_cache.get(path.stem) or {}
+        for item in menu.get("items", []):
+            key = item.get("name", "").strip().lower()
+            if not key:
+                continue
+            counts[key] += 1
+            example = examples.setdefault(key, {"name": item["name"]})
+            recipe = item.get("recipe") or {}
+            if recipe.get("title") and not is_placeholder_recipe(recipe) and "recipe" not in example:
+                example["recipe"] = recipe
+    return counts, examples
+
+
+async def build_seed_pack(root: Path, top_k: int, version: str | None = None) -> Path:
+    # Imported lazily: agents_flow itself loads seed packs at import time.
+    from .agents_flow import fetch_item_image, fetch_item_recipe, menu_cache
+
+    version = version or time.strftime("%Y%m%d%H%M%S")
+    counts, examples = tally_items(menu_cache)
+    staging = root / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    items: dict[str, dict] = {}
+    for key, count in counts.most_common(top_k):
+        example = examples[key]
+        recipe = example.get("recipe") or await fetch_item_recipe(example["name"])
+        if is_placeholder_recipe(recipe):
+            # Recipe generation failed; leave it to the agents rather than pin the stand-in.
+            logger.warning("Not seeding placeholder recipe for item=%s", key)
+            recipe = None
+        image_data = await fetch_item_image({"name": example["name"]})
+        image_file = None
+        if image_data and image_data.startswith("data:image/png;base64,"):
+            image_file = image_filename(key)
+            (staging / image_file).write_bytes(base64.b64decode(image_data.split(",", 1)[1]))
+        items[key] = {"name": example["name"], "count": count, "recipe": recipe, "image": image_file}
+        logger.info("Seeded item=%s count=%s image=%s", key, count, bool(image_file))
+    manifest = {"version": version, "created_at": time.time(), "items": items}
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    target = root / version
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--out", type=Path, default=SEED_ROOT)
+    parser.add_argument("--version")
+    args = parser.parse_args()
+    target = asyncio.run(build_seed_pack(args.out, args.top, args.version))
+    print(f"Wrote seed pack to {target}")
+
+
+if __name__ == "__main__":
+    main()
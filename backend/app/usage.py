@@ -0,0 +1,138 @@
+import contextvars
+import json
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# USD per million (input, output) tokens. Override or extend with MODEL_PRICES,
+# e.g. MODEL_PRICES='{"gpt-4o-mini": [0.15, 0.6]}'.
+DEFAULT_MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-image-1": (10.00, 40.00),
+    "gpt-image-1-mini": (2.50, 8.00),
+}
+
+# Ledger of the menu currently being built; tasks started for it inherit it.
+current_ledger: contextvars.ContextVar["UsageLedger | None"] = contextvars.ContextVar(
+    "usage_ledger", default=None
+)
+
+
+def load_prices(raw: str = "") -> dict[str, tuple[float, float]]:
+    prices = dict(DEFAULT_MODEL_PRICES)
+    if not raw:
+        return prices
+    try:
+        overrides = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning("Ignoring malformed MODEL_PRICES")
+        return prices
+    for model, pair in overrides.items() if isinstance(overrides, dict) else ():
+        try:
+            prices[model] = (float(pair[0]), float(pair[1]))
+        except (ValueError, TypeError, IndexError):
+            logger.warning("Ignoring malformed MODEL_PRICES entry for model=%s", model)
+    return prices
+
+
+def _empty_stage() -> dict:
+    return {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "seconds": 0.0, "models": {}}
+
+
+def _add(stage: dict, model: str, input_tokens: int, output_tokens: int, cost: float, seconds: float) -> None:
+    stage["calls"] += 1
+    stage["input_tokens"] += input_tokens
+    stage["output_tokens"] += output_tokens
+    stage["cost_usd"] += cost
+    stage["seconds"] += seconds
+    stage["models"][model] = stage["models"].get(model, 0) + 1
+
+
+def _summarize(stages: dict[str, dict]) -> dict[str, dict]:
+    return {
+        name: {
+            **stage,
+            "cost_usd": round(stage["cost_usd"], 6),
+            "seconds": round(stage["seconds"], 3),
+            "avg_seconds": round(stage["seconds"] / stage["calls"], 3) if stage["calls"] else 0.0,
+        }
+        for name, stage in stages.items()
+    }
+
+
+class UsageReport:
+    """Token, cost and latency totals by stage across all menus, plus recent menus."""
+
+    def __init__(self, prices: dict[str, tuple[float, float]], recent: int = 50) -> None:
+        self.prices = prices
+        self.stages: dict[str, dict] = {}
+        self.menus = 0
+        self._recent: deque[UsageLedger] = deque(maxlen=recent)
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        input_price, output_price = self.prices.get(model, (0.0, 0.0))
+        return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def add_menu(self, ledger: "UsageLedger") -> None:
+        self.menus += 1
+        self._recent.append(ledger)
+
+    def report(self) -> dict:
+        total_cost = sum(stage["cost_usd"] for stage in self.stages.values())
+        return {
+            "menus": self.menus,
+            "cost_usd": round(total_cost, 6),
+            "cost_per_menu_usd": round(total_cost / self.menus, 6) if self.menus else 0.0,
+            "stages": _summarize(self.stages),
+            "recent": [ledger.summary() for ledger in reversed(self._recent)],
+        }
+
+
+class UsageLedger:
+    """Per-menu usage by stage, with an optional spend budget in USD.
+
+    Costs are estimated from MODEL_PRICES; a run that hands off between
+    agents is priced at the model of the agent it started with.
+    """
+
+    def __init__(self, title: str, report: UsageReport, budget: float = 0.0) -> None:
+        self.title = title
+        self.report = report
+        self.budget = budget
+        self.started = time.time()
+        self.stages: dict[str, dict] = {}
+        self.cost = 0.0
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget > 0 and self.cost >= self.budget
+
+    def record(self, stage: str, model: str, usage, seconds: float) -> None:
+        """Add one upstream call; usage is any object with input/output token counts, or None."""
+        input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+        output_tokens = int(getattr(usage, "output_tokens", 0) or 0)
+        cost = self.report.cost(model, input_tokens, output_tokens)
+        was_over = self.over_budget
+        self.cost += cost
+        for stages in (self.stages, self.report.stages):
+            _add(stages.setdefault(stage, _empty_stage()), model, input_tokens, output_tokens, cost, seconds)
+        if self.over_budget and not was_over:
+            logger.warning(
+                "Menu budget of $%.4f exhausted for title=%s after stage=%s", self.budget, self.title, stage
+            )
+
+    def summary(self) -> dict:
+        return {
+            "title": self.title,
+            "started_at": self.started,
+            "cost_usd": round(self.cost, 6),
+            "budget_usd": self.budget,
+            "over_budget": self.over_budget,
+            "stages": _summarize(self.stages),
+        }
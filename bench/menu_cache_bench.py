@@ -0,0 +1,89 @@
+"""Compare menu cache serializers and compressions on a synthetic menu payload.
+
+    python bench/menu_cache_bench.py [--items 5] [--image-kb 1500] [--repeat 20]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app.menu_cache import available_formats, decode_menu, encode_menu  # noqa: E402
+
+
+def build_payload(items: int, image_kb: int) -> dict:
+    image = base64.b64encode(os.urandom(image_kb * 1024)).decode("ascii")
+    return {
+        "items": [
+            {
+                "name": f"Item {index}",
+                "reason": "Shown in the diner scene. " * 4,
+                "image_data": f"data:image/png;base64,{image}",
+                "recipe": {
+                    "title": f"Item {index} recipe",
+                    "source": "TheMealDB",
+                    "url": "https://example.com/recipe",
+                    "ingredients": [f"ingredient {n}" for n in range(12)],
+                    "steps": [f"Step {n}: stir and season to taste." for n in range(8)],
+                },
+            }
+            for index in range(items)
+        ],
+        "notes": "Synthetic benchmark menu",
+    }
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Menu cache serialization benchmark")
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--image-kb", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_payload(args.items, args.image_kb)
+    legacy = json.dumps(payload, ensure_ascii=True, indent=2).encode("ascii")
+    rows = [
+        (
+            "legacy json (indent=2)",
+            len(legacy),
+            _best_of(args.repeat, lambda: json.dumps(payload, ensure_ascii=True, indent=2)),
+            _best_of(args.repeat, lambda: json.loads(legacy)),
+        )
+    ]
+    serializers, compressions = available_formats()
+    for serializer in serializers:
+        for compression in compressions:
+            encoded = encode_menu(payload, serializer, compression)
+            assert decode_menu(encoded) == payload
+            rows.append(
+                (
+                    f"{serializer}+{compression}",
+                    len(encoded),
+                    _best_of(args.repeat, lambda: encode_menu(payload, serializer, compression)),
+                    _best_of(args.repeat, lambda: decode_menu(encoded)),
+                )
+            )
+
+    print(f"{'format':<24}{'bytes':>12}{'dump ms':>10}{'load ms':>10}")
+    for name, size, dump_ms, load_ms in rows:
+        print(f"{name:<24}{size:>12}{dump_ms:>10.2f}{load_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""Load and soak test /movies/menu and /movies/search against local stubs.
+
+The app runs in-process with the agents, movie search and caches replaced by
+stubs under a temporary directory, so only our own code is exercised. RSS,
+tracemalloc top allocators, open file descriptors and event-loop lag are
+sampled over time; the run fails if growth after warmup exceeds thresholds
+or too many menu requests are shed with 503.
+
+    python bench/soak.py --profile load
+    python bench/soak.py --profile soak --duration 14400 --report soak.json
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+os.environ.setdefault("OPENAI_API_KEY", "soak-test")
+
+from backend.app import agents_flow, main  # noqa: E402
+from backend.app.image_cache import DiskImageCache  # noqa: E402
+from backend.app.image_index import ImageNameIndex  # noqa: E402
+from backend.app.loop_monitor import LoopMonitor  # noqa: E402
+from backend.app.memory_cache import MemoryLRUCache  # noqa: E402
+from backend.app.menu_cache import MenuCache  # noqa: E402
+from backend.app.rate_limit import RateLimiter  # noqa: E402
+
+PROFILES = {
+    # Short, highly concurrent run to shake out contention and shedding.
+    "load": {
+        "duration": 60.0,
+        "concurrency": 32,
+        "warmup": 10.0,
+        "sample_interval": 5.0,
+        "max_rss_growth_mb": 64.0,
+        "max_fd_growth": 16,
+        "max_lag_ms": 250.0,
+        "max_shed_ratio": 0.05,
+    },
+    # Long, steady run where any unbounded state shows up as growth.
+    "soak": {
+        "duration": 4 * 3600.0,
+        "concurrency": 4,
+        "warmup": 300.0,
+        "sample_interval": 60.0,
+        "max_rss_growth_mb": 32.0,
+        "max_fd_growth": 8,
+        "max_lag_ms": 100.0,
+        "max_shed_ratio": 0.01,
+    },
+}
+
+TITLES = [
+    "Jaws", "Grease", "Ratatouille", "Chef", "Big Night", "Julie & Julia", "Tampopo",
+    "Spirited Away", "The Godfather", "Pulp Fiction", "Chocolat", "Babette's Feast",
+    "Goodfellas", "The Menu", "Burnt", "Mystic Pizza", "Soul Kitchen", "Eat Drink Man Woman",
+]
+FOOD_ITEMS = [
+    "Popcorn", "Clam Chowder", "Milkshake", "Ratatouille", "Cuban Sandwich", "Timpano",
+    "Boeuf Bourguignon", "Ramen", "Onigiri", "Cannoli", "Royale with Cheese", "Hot Chocolate",
+    "Quail in Pastry", "Marinara", "Cheeseburger", "Pizza", "Dumplings", "Pancakes",
+    "Lemon Tart", "Risotto", "Tiramisu", "Fried Chicken", "Pad Thai", "Churros",
+]
+
+# 1x1 PNG; stub images are padded past IEND to the requested size.
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8/5+hHgAHggJ/PchI7wAAAABJRU5ErkJggg=="
+)
+
+
+class _StubStream:
+    def __init__(self, final_output: str) -> None:
+        self.final_output = final_output
+
+    async def stream_events(self):
+        return
+        yield
+
+
+class _Stubs:
+    """Replace upstream calls and on-disk state for the duration of a run."""
+
+    def __init__(self, root: Path, image_kb: int, upstream_delay: float, concurrency: int) -> None:
+        self.root = root
+        self.image_kb = image_kb
+        self.upstream_delay = upstream_delay
+        self.concurrency = concurrency
+
+    def run_streamed(self, agent, input, **kwargs) -> _StubStream:
+        title = input.split("Movie title: ", 1)[1].split(". Verify", 1)[0]
+        picker = random.Random(title)
+        items = [
+            {"name": name, "reason": f"Served in {title}"}
+            for name in picker.sample(FOOD_ITEMS, 5)
+        ]
+        return _StubStream(json.dumps({"items": items, "notes": ""}))
+
+    async def run(self, agent, input, **kwargs) -> SimpleNamespace:
+        await asyncio.sleep(self.upstream_delay * random.uniform(0.5, 1.5))
+        item_name = input.split(": ", 1)[1]
+        if agent.name == "RecipeAgent":
+            return SimpleNamespace(
+                final_output={"title": f"{item_name} recipe", "source": "stub", "url": ""}
+            )
+        key = item_name.strip().lower()
+        padding = os.urandom(max(0, self.image_kb * 1024 - len(_PNG)))
+        encoded = base64.b64encode(_PNG + padding).decode("ascii")
+        await agents_flow.disk_cache.aset(key, f"data:image/png;base64,{encoded}")
+        return SimpleNamespace(final_output={"image_key": key})
+
+    @staticmethod
+    def search_movies(query: str) -> list[dict[str, str]]:
+        return [
+            {"title": title, "year": "1999", "imdb_id": f"tt{index:07d}", "poster": ""}
+            for index, title in enumerate(TITLES)
+            if query.lower() in title.lower()
+        ][:10]
+
+    @contextlib.contextmanager
+    def installed(self):
+        executor = agents_flow.cache_executor
+        menu_cache = MenuCache(self.root / "menus", executor=executor)
+        patches = [
+            mock.patch.object(agents_flow.Runner, "run_streamed", self.run_streamed),
+            mock.patch.object(agents_flow.Runner, "run", self.run),
+            mock.patch.object(agents_flow, "menu_cache", menu_cache),
+            mock.patch.object(main, "menu_cache", menu_cache),
+            mock.patch.object(agents_flow, "disk_cache", DiskImageCache(self.root / "images", executor=executor)),
+            mock.patch.object(agents_flow, "image_index", ImageNameIndex(self.root / "image_index.txt")),
+            mock.patch.object(agents_flow, "image_memory_cache", MemoryLRUCache(main.settings.image_memory_cache_size)),
+            mock.patch.object(main, "search_movies", self.search_movies),
+            mock.patch.object(main, "rate_limiter", RateLimiter({"menu": (0, 0), "search": (0, 0)})),
+            # Every simulated user may hold a menu slot; shedding is measured, not the goal.
+            mock.patch.object(
+                main.settings, "max_inflight_menus", max(main.settings.max_inflight_menus, self.concurrency)
+            ),
+        ]
+        with contextlib.ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            yield
+
+
+async def _call(app, method: str, path: str, body: dict | None = None, query: str = "") -> int:
+    """Send one request straight through the ASGI app and return its status code."""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": query.encode("ascii"),
+        "root_path": "",
+        "headers": [(b"host", b"soak"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("soak", 80),
+    }
+    sent = False
+    status = 0
+
+    async def receive() -> dict:
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        # Peak rather than current RSS; still catches monotonic growth.
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _open_fds() -> int | None:
+    for path in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(path))
+        except OSError:
+            continue
+    return None
+
+
+async def run_soak(
+    duration: float,
+    concurrency: int,
+    warmup: float,
+    sample_interval: float,
+    max_rss_growth_mb: float,
+    max_fd_growth: int,
+    max_lag_ms: float,
+    max_shed_ratio: float = 0.05,
+    fresh_ratio: float = 0.2,
+    search_ratio: float = 0.5,
+    image_kb: int = 64,
+    upstream_delay: float = 0.01,
+    top_allocators: int = 10,
+    trace: bool = True,
+) -> dict:
+    """Drive the app for duration seconds and return a report with samples and failures."""
+    statuses: dict[str, dict[int, int]] = {"menu": {}, "search": {}}
+    lags: list[float] = []
+    samples: list[dict] = []
+    baseline: dict | None = None
+    baseline_snapshot = None
+    stop = asyncio.Event()
+    started = time.monotonic()
+
+    async def user(index: int) -> None:
+        picker = random.Random(index)
+        round_number = 0
+        while not stop.is_set():
+            round_number += 1
+            title = picker.choice(TITLES)
+            if picker.random() < search_ratio:
+                status = await _call(main.app, "GET", "/movies/search", query=f"query={title[:4]}")
+                statuses["search"][status] = statuses["search"].get(status, 0) + 1
+                continue
+            if picker.random() < fresh_ratio:
+                # Rotate in titles that miss the menu cache to keep the build path hot.
+                title = f"{title} {index}-{round_number}"
+            status = await _call(main.app, "POST", "/movies/menu", body={"title": title})
+            statuses["menu"][status] = statuses["menu"].get(status, 0) + 1
+
+    async def lag_probe(interval: float = 0.05) -> None:
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, loop.time() - expected) * 1000)
+
+    def take_sample() -> dict:
+        window = sorted(lags)
+        lags.clear()
+        return {
+            "elapsed": round(time.monotonic() - started, 1),
+            "rss_mb": round(_rss_bytes() / 1024 / 1024, 2),
+            "open_fds": _open_fds(),
+            "lag_p99_ms": round(window[int(len(window) * 0.99) - 1], 2) if window else 0.0,
+            "lag_max_ms": round(window[-1], 2) if window else 0.0,
+            "traced_mb": round(tracemalloc.get_traced_memory()[0] / 1024 / 1024, 2) if trace else None,
+            "requests": sum(sum(counts.values()) for counts in statuses.values()),
+        }
+
+    if trace:
+        tracemalloc.start(10)
+    with tempfile.TemporaryDirectory(prefix="flickfeast-soak-") as root:
+        with _Stubs(Path(root), image_kb, upstream_delay, concurrency).installed():
+            tasks = [asyncio.create_task(user(index)) for index in range(concurrency)]
+            tasks.append(asyncio.create_task(lag_probe()))
+            loop_monitor = LoopMonitor(threshold=max_lag_ms / 1000)
+            loop_monitor.start()
+            try:
+                while time.monotonic() - started < duration:
+                    await asyncio.sleep(min(sample_interval, duration - (time.monotonic() - started)))
+                    sample = take_sample()
+                    samples.append(sample)
+                    print(json.dumps(sample), flush=True)
+                    if baseline is None and sample["elapsed"] >= warmup:
+                        baseline = sample
+                        baseline_snapshot = tracemalloc.take_snapshot() if trace else None
+            finally:
+                stop.set()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await asyncio.gather(*agents_flow._background_tasks, return_exceptions=True)
+                await loop_monitor.stop()
+
+    growers: list[str] = []
+    if trace and baseline_snapshot is not None:
+        stats = tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")
+        growers = [str(stat) for stat in stats[:top_allocators] if stat.size_diff > 0]
+    if trace:
+        tracemalloc.stop()
+
+    failures: list[str] = []
+    final = samples[-1] if samples else None
+    if baseline is not None and final is not None and final is not baseline:
+        rss_growth = final["rss_mb"] - baseline["rss_mb"]
+        if rss_growth > max_rss_growth_mb:
+            failures.append(f"RSS grew {rss_growth:.1f} MB after warmup (limit {max_rss_growth_mb} MB)")
+        if final["open_fds"] is not None and baseline["open_fds"] is not None:
+            fd_growth = final["open_fds"] - baseline["open_fds"]
+            if fd_growth > max_fd_growth:
+                failures.append(f"Open file descriptors grew by {fd_growth} (limit {max_fd_growth})")
+    steady = [sample["lag_p99_ms"] for sample in samples if baseline and sample["elapsed"] >= baseline["elapsed"]]
+    if steady and statistics.median(steady) > max_lag_ms:
+        failures.append(f"Median p99 event-loop lag {statistics.median(steady):.0f} ms (limit {max_lag_ms} ms)")
+    server_errors = sum(
+        count for counts in statuses.values() for status, count in counts.items() if status >= 500 and status != 503
+    )
+    if server_errors:
+        failures.append(f"{server_errors} requests failed with a server error")
+    menu_requests = sum(statuses["menu"].values())
+    shed_ratio = statuses["menu"].get(503, 0) / menu_requests if menu_requests else 0.0
+    if shed_ratio > max_shed_ratio:
+        failures.append(f"{shed_ratio:.1%} of menu requests were shed with 503 (limit {max_shed_ratio:.1%})")
+
+    return {
+        "baseline": baseline,
+        "final": final,
+        "samples": samples,
+        "statuses": {name: dict(sorted(counts.items())) for name, counts in statuses.items()},
+        "shed_ratio": round(shed_ratio, 4),
+        "top_allocators": growers,
+        "blocking_sites": loop_monitor.metrics()["blocking_sites"],
+        "failures": failures,
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="load")
+    for name, default in PROFILES["load"].items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=None)
+    parser.add_argument("--fresh-ratio", type=float, default=0.2)
+    parser.add_argument("--search-ratio", type=float, default=0.5)
+    parser.add_argument("--image-kb", type=int, default=64)
+    parser.add_argument("--upstream-delay", type=float, default=0.01)
+    parser.add_argument("--no-tracemalloc", action="store_true")
+    parser.add_argument("--report", type=Path)
+    args = parser.parse_args()
+
+    options = {
+        name: getattr(args, name) if getattr(args, name) is not None else default
+        for name, default in PROFILES[args.profile].items()
+    }
+    report = asyncio.run(
+        run_soak(
+            **options,
+            fresh_ratio=args.fresh_ratio,
+            search_ratio=args.search_ratio,
+            image_kb=args.image_kb,
+            upstream_delay=args.upstream_delay,
+            trace=not args.no_tracemalloc,
+        )
+    )
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"statuses: {report['statuses']} shed: {report['shed_ratio']:.1%}")
+    for line in report["top_allocators"]:
+        print(f"  {line}")
+    for site, count in report["blocking_sites"].items():
+        print(f"  blocked {count}x at {site}")
+    for failure in report["failures"]:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
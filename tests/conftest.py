@@ -1,7 +1,134 @@
+import asyncio
+import json
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from openai.types.responses import ResponseCompletedEvent, ResponseTextDeltaEvent
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.app import agents_flow  # noqa: E402
+from backend.app.cassette import Cassette  # noqa: E402
+from backend.app.memory_cache import MemoryLRUCache  # noqa: E402
+from backend.app.menu_cache import MenuCache  # noqa: E402
+
+CASSETTE_ROOT = Path(__file__).resolve().parent / "cassettes"
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("cassette", "upstream recording and replay")
+    group.addoption(
+        "--record-cassettes",
+        action="store_true",
+        help="call real upstreams and rewrite cassettes used by the cassette fixture",
+    )
+    group.addoption(
+        "--cassette-latency-scale",
+        type=float,
+        default=0.0,
+        help="multiply recorded upstream latencies on replay (1 = as recorded)",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "cassette(name): replay upstream calls from tests/cassettes/<name>.json"
+    )
+
+
+@pytest.fixture
+def cassette(request):
+    """Serve upstream calls from a recorded cassette, or record one with --record-cassettes."""
+    marker = request.node.get_closest_marker("cassette")
+    name = marker.args[0] if marker else request.node.name
+    path = CASSETTE_ROOT / f"{name}.json"
+    if request.config.getoption("--record-cassettes"):
+        recorder = Cassette(path, mode="record")
+    elif not path.exists():
+        pytest.skip(f"cassette {name} not recorded; run pytest --record-cassettes")
+    else:
+        recorder = Cassette(path, latency_scale=request.config.getoption("--cassette-latency-scale"))
+    with recorder.installed():
+        yield recorder
+
+
+class FakeStream:
+    """A Runner.run_streamed result that streams its steps, then finishes with final_output.
+
+    Steps are text deltas (str), pauses until an asyncio.Event is set, or sleeps
+    (float seconds); with no steps the whole final_output arrives as one delta.
+    With usage, a completed model response carrying it comes before the steps.
+    """
+
+    def __init__(self, final_output, *steps, usage=None):
+        self.final_output = final_output
+        self.steps = steps or (final_output,)
+        self.usage = usage
+        self.context_wrapper = SimpleNamespace(usage=usage)
+        self.finished = False
+
+    async def stream_events(self):
+        yield SimpleNamespace(type="agent_updated_stream_event", new_agent=SimpleNamespace(name="PartyPlanner"))
+        if self.usage is not None:
+            yield SimpleNamespace(
+                type="raw_response_event",
+                data=ResponseCompletedEvent.model_construct(
+                    type="response.completed", response=SimpleNamespace(usage=self.usage)
+                ),
+            )
+        for step in self.steps:
+            if isinstance(step, asyncio.Event):
+                await step.wait()
+            elif isinstance(step, (int, float)):
+                await asyncio.sleep(step)
+            else:
+                yield SimpleNamespace(
+                    type="raw_response_event",
+                    data=ResponseTextDeltaEvent.model_construct(type="response.output_text.delta", delta=step),
+                )
+        self.finished = True
+
+
+class FakeAgents:
+    """Stands in for the upstream agents; tests supply menus and the item run behaviour."""
+
+    stream = FakeStream
+
+    def __init__(self, monkeypatch):
+        self.monkeypatch = monkeypatch
+
+    def isolate(self, root):
+        """Point the menu and image caches at empty stores under root."""
+        self.monkeypatch.setattr(agents_flow, "menu_cache", MenuCache(root / "menus"))
+        self.monkeypatch.setattr(agents_flow, "image_memory_cache", MemoryLRUCache())
+        self.monkeypatch.setattr(agents_flow, "_resolve_image_key", lambda cache_key: None)
+
+    def install(self, menus, run, **stream_options):
+        """Patch Runner with run and a menu stream built from menus.
+
+        menus maps a title to its item names or item dicts, or is a callable
+        taking (agent, input) and returning a FakeStream.
+        """
+
+        def run_streamed(agent, input, **kwargs):
+            if callable(menus):
+                return menus(agent, input)
+            title = input.split("Movie title: ", 1)[1].split(".", 1)[0]
+            items = [{"name": item, "reason": title} if isinstance(item, str) else item for item in menus[title]]
+            return FakeStream(json.dumps({"items": items, "notes": ""}), **stream_options)
+
+        self.monkeypatch.setattr(agents_flow.Runner, "run_streamed", run_streamed)
+        self.monkeypatch.setattr(agents_flow.Runner, "run", run)
+
+
+@pytest.fixture
+def fake_agents(monkeypatch, tmp_path):
+    """Fake upstream agents over empty menu and image caches."""
+    agents = FakeAgents(monkeypatch)
+    agents.isolate(tmp_path)
+    return agents
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from backend.app import readonly
+from backend.app.bundle import MenuBundle, export_bundle, import_bundle
+from backend.app.config import settings
+from backend.app.image_cache import image_filename
+from backend.app.menu_cache import MenuCache
+
+MENU = {"items": [{"name": "Big Kahuna Burger", "reason": "Jules", "image_data": None}], "notes": ""}
+
+
+def _export(tmp_path):
+    MenuCache(tmp_path / "menus").set("Pulp Fiction", MENU)
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / image_filename("big kahuna burger")).write_bytes(b"png-bytes")
+    (tmp_path / "images" / image_filename("big kahuna burger", "thumb")).write_bytes(b"webp-bytes")
+    count = export_bundle(tmp_path / "menus.bundle", tmp_path / "menus", tmp_path / "images")
+    assert count == 3
+    return tmp_path / "menus.bundle"
+
+
+def test_bundle_round_trip(tmp_path):
+    path = _export(tmp_path)
+    bundle = MenuBundle(path)
+
+    assert bundle.menu("pulp fiction").tobytes().startswith(b'{"items":')
+    assert bundle.menu("Jaws") is None
+
+    assert import_bundle(path, tmp_path / "menus2", tmp_path / "images2") == 3
+    assert MenuCache(tmp_path / "menus2").get("Pulp Fiction") == MENU
+
+
+def test_readonly_app_serves_from_bundle(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "menu_bundle_path", str(_export(tmp_path)))
+    readonly.get_bundle.cache_clear()
+    client = TestClient(readonly.app)
+
+    menu = client.post("/movies/menu", json={"title": "Pulp Fiction"})
+    variant = client.post("/movies/menu", json={"title": "Pulp Fiction", "image_variant": "thumb"})
+    image = client.get("/images/Big Kahuna Burger", params={"variant": "thumb"})
+    readonly.get_bundle.cache_clear()
+
+    assert menu.json() == MENU
+    assert variant.json()["items"][0]["image_data"] == "data:image/webp;base64,d2VicC1ieXRlcw=="
+    assert (image.content, image.headers["content-type"]) == (b"webp-bytes", "image/webp")
+    assert client.post("/movies/menu", json={"title": "Jaws"}).status_code == 404
+
+
+def test_readonly_app_does_not_import_agents():
+    code = "import sys, backend.app.readonly; print('agents' in sys.modules or 'openai' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,131 @@
+import asyncio
+import base64
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app import agents_flow, main, movie_api
+from backend.app.cassette import Cassette, CassetteMiss
+from backend.app.image_cache import DiskImageCache
+from backend.app.movie_api import MovieApiError
+
+UPSTREAM_DELAY = 0.05
+# build_menu's own work for one replayed three-item menu.
+REPLAY_OVERHEAD = 0.5
+
+
+def _fresh_caches(fake_agents, monkeypatch, root):
+    fake_agents.isolate(root)
+    monkeypatch.setattr(agents_flow, "disk_cache", DiskImageCache(root / "images"))
+    monkeypatch.setattr(
+        agents_flow, "_resolve_image_key", lambda key: key if agents_flow.disk_cache.has(key) else None
+    )
+
+
+def _install_upstream(fake_agents):
+    def fake_run_streamed(agent, input, **kwargs):
+        names = ("Clam Chowder", "Saltwater Taffy", "Lobster Roll")
+        menu = json.dumps({"items": [{"name": name, "reason": "Amity"} for name in names], "notes": "Jaws"})
+        return fake_agents.stream(menu, UPSTREAM_DELAY, menu)
+
+    async def fake_run(agent, input, **kwargs):
+        await asyncio.sleep(UPSTREAM_DELAY)
+        item_name = input.split(": ", 1)[1]
+        if agent.name == "RecipeAgent":
+            recipe = {"title": f"{item_name} recipe", "source": "", "url": ""}
+            return SimpleNamespace(final_output=json.dumps(recipe))
+        key = item_name.strip().lower()
+        # Stands in for generate_food_image writing the image from inside the run.
+        agents_flow.disk_cache.set(key, "data:image/png;base64," + base64.b64encode(key.encode()).decode())
+        return SimpleNamespace(final_output={"image_key": key})
+
+    fake_agents.install(fake_run_streamed, fake_run)
+
+
+def _fail_upstream(monkeypatch):
+    def unexpected(*args, **kwargs):
+        raise AssertionError("upstream called during replay")
+
+    monkeypatch.setattr(agents_flow.Runner, "run_streamed", unexpected)
+    monkeypatch.setattr(agents_flow.Runner, "run", unexpected)
+
+
+def _record(fake_agents, monkeypatch, tmp_path):
+    _fresh_caches(fake_agents, monkeypatch, tmp_path / "record")
+    _install_upstream(fake_agents)
+    with Cassette(tmp_path / "jaws.json", mode="record").installed():
+        menu = asyncio.run(agents_flow.build_menu("Jaws"))
+    return menu
+
+
+def test_replay_reproduces_recorded_menu_without_upstream(fake_agents, monkeypatch, tmp_path):
+    recorded = _record(fake_agents, monkeypatch, tmp_path)
+    assert [item["image_data"] for item in recorded["items"]][0].startswith("data:image/png")
+
+    _fresh_caches(fake_agents, monkeypatch, tmp_path / "replay")
+    _fail_upstream(monkeypatch)
+    with Cassette(tmp_path / "jaws.json", latency_scale=0).installed() as cassette:
+        replayed = asyncio.run(agents_flow.build_menu("Jaws"))
+
+    assert replayed == recorded
+    assert cassette.unused() == 0
+
+
+def test_replay_keeps_fan_out_concurrent(fake_agents, monkeypatch, tmp_path):
+    _record(fake_agents, monkeypatch, tmp_path)
+    entries = json.loads((tmp_path / "jaws.json").read_text())["entries"]
+    assert len(entries) == 7
+
+    _fresh_caches(fake_agents, monkeypatch, tmp_path / "replay")
+    _fail_upstream(monkeypatch)
+    with Cassette(tmp_path / "jaws.json", latency_scale=1).installed():
+        started = time.perf_counter()
+        asyncio.run(agents_flow.build_menu("Jaws"))
+        elapsed = time.perf_counter() - started
+
+    assert elapsed >= 2 * UPSTREAM_DELAY
+    # Serializing the six item runs would take at least their summed latency.
+    assert elapsed < sum(entry["elapsed"] for entry in entries) * 0.6
+
+
+def test_replay_raises_recorded_errors_and_misses(monkeypatch, tmp_path):
+    def failing_search(query):
+        raise MovieApiError("OMDb is down")
+
+    monkeypatch.setattr(movie_api, "search_movies", failing_search)
+    with Cassette(tmp_path / "search.json", mode="record").installed():
+        with pytest.raises(MovieApiError):
+            main.search_movies("jaws")
+
+    with Cassette(tmp_path / "search.json").installed():
+        with pytest.raises(MovieApiError, match="OMDb is down"):
+            main.search_movies("jaws")
+        with pytest.raises(CassetteMiss):
+            main.search_movies("grease")
+
+
+def _replay_budget(cassette):
+    """Recorded latency on the critical path: the menu stream, then the slowest item run."""
+    streams = [entry["elapsed"] for entry in cassette.entries if entry["target"] == "Runner.run_streamed"]
+    runs = [entry["elapsed"] for entry in cassette.entries if entry["target"] == "Runner.run"]
+    return (sum(streams) + max(runs, default=0.0)) * cassette.latency_scale
+
+
+# tests/cassettes/jaws.json was recorded against the fake upstream in
+# _install_upstream; --record-cassettes rewrites it from the real services.
+@pytest.mark.cassette("jaws")
+def test_build_menu_from_recorded_upstream(cassette, fake_agents, monkeypatch, tmp_path):
+    _fresh_caches(fake_agents, monkeypatch, tmp_path)
+
+    started = time.perf_counter()
+    menu = asyncio.run(agents_flow.build_menu("Jaws"))
+    elapsed = time.perf_counter() - started
+
+    assert menu["items"]
+    assert all(item.get("image_data") and item.get("recipe") for item in menu["items"])
+    if cassette.mode == "replay":
+        assert cassette.unused() == 0
+        # Upstream time is replayed, so anything beyond it is our own overhead.
+        assert elapsed < _replay_budget(cassette) + REPLAY_OVERHEAD
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend.app import agents_flow
+from backend.app.latency import LatencyTracker, StageLatency
+
+
+def test_latency_tracker_degrades_above_threshold():
+    tracker = LatencyTracker(threshold=10, alpha=0.5)
+    assert not tracker.degraded
+    tracker.observe(4)
+    tracker.observe(20)
+    assert tracker.average == 12
+    assert tracker.degraded
+    assert not LatencyTracker(threshold=0).degraded
+
+
+def test_stale_average_stops_degrading(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.app.latency.time.monotonic", lambda: now[0])
+    tracker = LatencyTracker(threshold=10, stale_after=60)
+    tracker.observe(30)
+    assert tracker.degraded
+
+    now[0] += 61
+    assert not tracker.degraded
+    tracker.observe(2)
+    assert tracker.average == 2
+
+
+def test_image_runs_have_their_own_threshold():
+    latency = StageLatency({"recipe": 15, "image": 45})
+    latency.observe("image", 30)
+    latency.observe("menu_repair", 99)
+    assert not latency.degraded
+
+    latency.observe("recipe", 20)
+    assert latency.degraded_stages() == {"recipe": 20}
+
+
+def test_failed_runs_are_observed(monkeypatch):
+    latency = StageLatency({"recipe": 15})
+    monkeypatch.setattr(agents_flow, "upstream_latency", latency)
+
+    async def failing_run(agent, input, **kwargs):
+        raise RuntimeError("upstream timeout")
+
+    monkeypatch.setattr(agents_flow.Runner, "run", failing_run)
+    monkeypatch.setattr(agents_flow, "search_recipes", lambda query, limit: [])
+    monkeypatch.setattr(agents_flow, "seed_pack", agents_flow.SeedPack())
+
+    asyncio.run(agents_flow.fetch_item_recipe("Gumbo"))
+
+    assert latency.trackers["recipe"].average is not None
+
+
+def test_build_menu_returns_partial_menu_and_finishes_in_background(fake_agents):
+    release = asyncio.Event()
+
+    async def fake_run(agent, input, **kwargs):
+        if agent.name == "RecipeAgent":
+            if "Slow Gumbo" in input:
+                await release.wait()
+            return SimpleNamespace(final_output={"title": input, "source": "", "url": ""})
+        return SimpleNamespace(final_output={})
+
+    fake_agents.install({"Bayou": ["Slow Gumbo", "Quick Toast"]}, fake_run)
+
+    async def scenario():
+        menu = await agents_flow.build_menu("Bayou", latency_budget=0.1)
+        slow, quick = menu["items"]
+        assert slow["pending"] == ["recipe"]
+        assert "pending" not in quick
+        assert quick["recipe"]["title"] == "Menu item: Quick Toast"
+
+        release.set()
+        await asyncio.gather(*agents_flow._background_tasks)
+        return agents_flow.menu_cache.get("Bayou")
+
+    cached = asyncio.run(scenario())
+    slow, quick = cached["items"]
+    assert "pending" not in slow
+    assert slow["recipe"]["title"] == "Menu item: Slow Gumbo"
@@ -0,0 +1,70 @@
+import asyncio
+import base64
+import io
+
+import pytest
+
+from backend.app.image_cache import DiskImageCache
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _png_data_uri(size):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(buffer, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def test_set_writes_downscaled_variants(tmp_path):
+    cache = DiskImageCache(tmp_path)
+    cache.set("popcorn", _png_data_uri((1024, 1024)))
+
+    assert cache.get("popcorn").startswith("data:image/png;base64,")
+    thumb = cache.get("popcorn", "thumb")
+    assert thumb.startswith("data:image/webp;base64,")
+    raw = base64.b64decode(thumb.split(",", 1)[1])
+    with Image.open(io.BytesIO(raw)) as image:
+        assert image.size == (128, 128)
+
+
+def test_variant_built_lazily_for_existing_original(tmp_path):
+    DiskImageCache(tmp_path)._key_path("soda").write_bytes(
+        base64.b64decode(_png_data_uri((512, 256)).split(",", 1)[1])
+    )
+    cache = DiskImageCache(tmp_path)
+
+    card = cache.get("soda", "card")
+
+    assert card.startswith("data:image/webp;base64,")
+    assert cache._key_path("soda", "card").exists()
+
+
+def test_unknown_variant_returns_original(tmp_path):
+    cache = DiskImageCache(tmp_path)
+    cache.set("pie", _png_data_uri((64, 64)))
+
+    assert cache.get("pie", "poster").startswith("data:image/png;base64,")
+
+
+def test_async_get_returns_variant(tmp_path):
+    cache = DiskImageCache(tmp_path)
+
+    async def scenario():
+        await cache.aset("nachos", _png_data_uri((512, 256)))
+        return await cache.aget("nachos", "card"), await cache.aget("missing")
+
+    card, missing = asyncio.run(scenario())
+
+    assert card.startswith("data:image/webp;base64,")
+    assert missing is None
+
+
+def test_avif_falls_back_to_webp_without_encoder(tmp_path, monkeypatch):
+    from backend.app import image_cache
+
+    monkeypatch.setattr(image_cache.features, "check", lambda feature: False)
+    cache = DiskImageCache(tmp_path, variant_format="avif")
+    cache.set("fries", _png_data_uri((256, 256)))
+
+    assert cache.variant_format == "webp"
+    assert cache.get("fries", "thumb").startswith("data:image/webp;base64,")
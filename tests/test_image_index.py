@@ -0,0 +1,50 @@
+from backend.app.image_index import ImageNameIndex
+
+
+def test_nearest_reuses_close_names(tmp_path):
+    index = ImageNameIndex(tmp_path / "index.txt", threshold=0.7)
+    names = [
+        "Big Kahuna Burger",
+        "chocolate cake",
+        "royale with cheese",
+        "butterbeer",
+        "popcorn",
+        "pizza",
+        "spaghetti",
+        "ratatouille",
+        "gin martini",
+        "cheeseburger",
+    ]
+    for name in names:
+        index.add(name)
+
+    assert index.nearest("big kahuna burger with fries")[0] == "big kahuna burger"
+    assert index.nearest("Kahuna burger")[0] == "big kahuna burger"
+    assert index.nearest("chocolate milkshake") is None
+
+
+def test_index_persists_incrementally(tmp_path):
+    path = tmp_path / "index.txt"
+    ImageNameIndex(path).add("Royale with Cheese")
+    ImageNameIndex(path).add("royale with cheese")
+
+    assert path.read_text(encoding="utf-8").splitlines() == ["royale with cheese"]
+    assert ImageNameIndex(path).nearest("royale with cheese")[0] == "royale with cheese"
+
+
+def test_zero_threshold_disables_matching(tmp_path):
+    index = ImageNameIndex(tmp_path / "index.txt", threshold=0)
+    index.add("popcorn")
+
+    assert index.nearest("popcorn") is None
+
+
+def test_nearest_sees_names_added_after_lookup(tmp_path):
+    index = ImageNameIndex(tmp_path / "index.txt", threshold=0.7)
+    index.add("popcorn")
+    assert index.nearest("butterbeer") is None
+
+    index.add("butterbeer")
+
+    assert index.nearest("Butterbeer")[0] == "butterbeer"
+    assert index.nearest("popcorn")[0] == "popcorn"
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.app import main
+from backend.app.loop_monitor import LoopMonitor
+
+
+def _block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_loop_monitor_samples_blocking_call():
+    async def scenario():
+        monitor = LoopMonitor(threshold=0.05, interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        _block_the_loop(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor.metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["stalls"] == 1
+    assert metrics["max_lag_ms"] >= 150
+    [site] = metrics["blocking_sites"]
+    assert site.startswith("test_loop_monitor.py:")
+    assert site.endswith("_block_the_loop")
+    assert "time.sleep" in metrics["recent_stalls"][0]["stack"]
+    assert not metrics["enabled"]
+
+
+def test_loop_metrics_endpoint():
+    client = TestClient(main.app)
+
+    body = client.get("/metrics/loop").json()
+
+    assert body["stalls"] == 0
+    assert body["threshold_ms"] == main.settings.loop_monitor_threshold_ms
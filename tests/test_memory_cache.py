@@ -0,0 +1,82 @@
+import errno
+import multiprocessing
+
+from backend.app.memory_cache import MemoryLRUCache, SharedMemoryCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    cache = MemoryLRUCache(max_items=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+
+def test_shared_cache_round_trip_and_overwrite(tmp_path):
+    cache = SharedMemoryCache(tmp_path / "shm", slot_count=8, slot_size=1024)
+    cache.set("popcorn", "data:image/png;base64,AAAA")
+    cache.set("popcorn", "data:image/png;base64,BBBB")
+
+    assert cache.get("popcorn") == "data:image/png;base64,BBBB"
+    assert cache.get("pizza") is None
+    assert len(cache) == 1
+
+
+def test_shared_cache_skips_oversized_values_and_evicts_lru(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("backend.app.memory_cache.time.time", lambda: clock[0])
+    cache = SharedMemoryCache(tmp_path / "shm", slot_count=2, slot_size=256, probe_limit=2)
+    cache.set("huge", "x" * 1024)
+    for key in ("a", "b"):
+        clock[0] += 1
+        cache.set(key, key.upper())
+    clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.set("c", "C")
+
+    assert cache.get("huge") is None
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+
+
+def _write_from_child(path):
+    SharedMemoryCache(path, slot_count=8, slot_size=1024).set("shared", "from-child")
+
+
+def test_shared_cache_is_visible_across_processes(tmp_path):
+    path = tmp_path / "shm"
+    cache = SharedMemoryCache(path, slot_count=8, slot_size=1024)
+    cache.set("warm", "up")
+    process = multiprocessing.get_context("spawn").Process(target=_write_from_child, args=(path,))
+    process.start()
+    process.join(timeout=30)
+
+    assert process.exitcode == 0
+    assert cache.get("shared") == "from-child"
+    assert cache.get("warm") == "up"
+
+
+def test_shared_cache_with_new_layout_leaves_mapped_file_alone(tmp_path):
+    old = SharedMemoryCache(tmp_path / "shm", slot_count=8, slot_size=1024)
+    old.set("popcorn", "old-layout")
+    resized = SharedMemoryCache(tmp_path / "shm", slot_count=4, slot_size=2048)
+    resized.set("pizza", "new-layout")
+
+    assert old.path != resized.path
+    assert old.get("popcorn") == "old-layout"
+    assert resized.get("pizza") == "new-layout"
+
+
+def test_shared_cache_falls_back_when_filesystem_is_full(tmp_path, monkeypatch):
+    def no_space(fd, offset, length):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr("backend.app.memory_cache.os.posix_fallocate", no_space, raising=False)
+    cache = SharedMemoryCache(tmp_path / "shm", slot_count=8, slot_size=1024)
+    cache.set("popcorn", "local")
+
+    assert cache.get("popcorn") == "local"
+    assert len(cache) == 1
+    assert cache.path.stat().st_size == 0
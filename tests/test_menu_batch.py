@@ -0,0 +1,98 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.app import main
+from backend.app.rate_limit import RateLimiter
+
+
+def test_batch_menus_coalesce_shared_items(fake_agents, monkeypatch):
+    menus = {
+        "Jaws": ["Popcorn", "Clam Chowder"],
+        "Grease": ["popcorn", "Milkshake"],
+    }
+    calls = []
+
+    async def fake_run(agent, input, **kwargs):
+        calls.append((agent.name, input.split(": ", 1)[1].lower()))
+        if agent.name == "RecipeAgent":
+            return SimpleNamespace(final_output={"title": input, "source": "", "url": ""})
+        return SimpleNamespace(final_output={})
+
+    fake_agents.install(menus, fake_run)
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter({"menu": (6, 3), "search": (60, 20)}))
+
+    client = TestClient(main.app)
+    response = client.post("/movies/menus", json={"titles": ["Jaws", "Grease", "jaws"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [menu["title"] for menu in body["menus"]] == ["Jaws", "Grease"]
+    assert [item["name"] for item in body["menus"][1]["items"]] == ["popcorn", "Milkshake"]
+    assert calls.count(("FoodPhotoGenerator", "popcorn")) == 1
+    assert calls.count(("RecipeAgent", "popcorn")) == 1
+    assert len(calls) == 6
+
+
+def test_batch_reuses_items_finished_before_another_menu_starts(fake_agents, monkeypatch):
+    calls = []
+    jaws_done = asyncio.Event()
+
+    def fake_run_streamed(agent, input, **kwargs):
+        if "Jaws" in input:
+            return fake_agents.stream(json.dumps({"items": [{"name": "Popcorn", "reason": "Jaws"}], "notes": ""}))
+        # Grease's menu only arrives once Jaws's popcorn work has fully finished.
+        menu = json.dumps({"items": [{"name": "popcorn", "reason": "Grease"}], "notes": ""})
+        return fake_agents.stream(menu, jaws_done, menu)
+
+    async def fake_run(agent, input, **kwargs):
+        calls.append(agent.name)
+        if len(calls) == 2:
+            asyncio.get_running_loop().call_later(0.05, jaws_done.set)
+        if agent.name == "RecipeAgent":
+            return SimpleNamespace(final_output={"title": input, "source": "", "url": ""})
+        return SimpleNamespace(final_output={})
+
+    fake_agents.install(fake_run_streamed, fake_run)
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter({"menu": (6, 3), "search": (60, 20)}))
+
+    client = TestClient(main.app)
+    response = client.post("/movies/menus", json={"titles": ["Jaws", "Grease"]})
+
+    assert response.status_code == 200
+    assert sorted(calls) == ["FoodPhotoGenerator", "RecipeAgent"]
+    assert [menu["items"][0]["name"] for menu in response.json()["menus"]] == ["Popcorn", "popcorn"]
+
+
+def test_batch_menus_requires_titles():
+    client = TestClient(main.app)
+
+    assert client.post("/movies/menus", json={"titles": [" "]}).status_code == 400
+
+
+def test_batch_menus_charge_one_token_per_title(monkeypatch):
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter({"menu": (6, 3), "search": (60, 20)}))
+
+    async def fake_build_menu(title, **kwargs):
+        return {"items": [{"name": "Popcorn", "reason": title}], "notes": ""}
+
+    monkeypatch.setattr(main, "build_menu", fake_build_menu)
+    client = TestClient(main.app)
+
+    assert client.post("/movies/menus", json={"titles": ["Jaws", "Grease"]}).status_code == 200
+    limited = client.post("/movies/menus", json={"titles": ["Alien", "Heat"]})
+    assert limited.status_code == 429
+    assert client.post("/movies/menus", json={"titles": ["Alien"]}).status_code == 200
+
+
+def test_batch_menus_take_one_inflight_slot_per_title(monkeypatch):
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter({"menu": (0, 0), "search": (0, 0)}))
+    monkeypatch.setattr(main, "_inflight_menus", main.settings.max_inflight_menus - 1)
+    client = TestClient(main.app)
+
+    response = client.post("/movies/menus", json={"titles": ["Jaws", "Grease"]})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.app.menu_cache import MenuCache, available_formats
+
+MENU = {
+    "items": [{"name": "Butterbeer", "reason": "Three Broomsticks", "recipe": {"steps": ["Stir"]}}],
+    "notes": "Wizarding",
+}
+SERIALIZERS, COMPRESSIONS = available_formats()
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+@pytest.mark.parametrize("serializer", SERIALIZERS)
+def test_round_trip_and_cross_format_reads(tmp_path, serializer, compression):
+    MenuCache(tmp_path, serializer, compression).set("Harry Potter", MENU)
+
+    assert MenuCache(tmp_path).get("Harry Potter") == MENU
+
+
+def test_reads_legacy_pretty_json(tmp_path):
+    (tmp_path / "harry-potter.json").write_text(json.dumps(MENU, indent=2), encoding="utf-8")
+
+    assert MenuCache(tmp_path, "marshal", "zlib").get("Harry Potter") == MENU
+
+
+def test_default_writes_compact_json(tmp_path):
+    MenuCache(tmp_path).set("Harry Potter", MENU)
+
+    raw = (tmp_path / "harry-potter.json").read_text(encoding="utf-8")
+    assert json.loads(raw) == MENU
+    assert "\n" not in raw
+
+
+def test_corrupt_entry_and_unavailable_format(tmp_path):
+    (tmp_path / "broken.json").write_bytes(b"FFM1\x01\x01not zlib")
+    cache = MenuCache(tmp_path, "no-such-format", "no-such-codec")
+
+    assert cache.get("broken") is None
+    assert (cache.serializer, cache.compression) == ("json", "none")
+
+
+def test_async_api_runs_on_executor_without_leaving_temp_files(tmp_path):
+    threads = []
+
+    class RecordingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, /, *args, **kwargs):
+            threads.append(fn)
+            return super().submit(fn, *args, **kwargs)
+
+    async def scenario(cache):
+        await asyncio.gather(*(cache.aset("Harry Potter", MENU) for _ in range(8)))
+        assert await cache.ahas("Harry Potter")
+        return await cache.aget("Harry Potter")
+
+    with RecordingExecutor(max_workers=4) as executor:
+        cache = MenuCache(tmp_path, executor=executor)
+        assert asyncio.run(scenario(cache)) == MENU
+
+    assert len(threads) == 10
+    assert [path.name for path in tmp_path.iterdir()] == ["harry-potter.json"]
@@ -0,0 +1,124 @@
+import asyncio
+
+from backend.app.menu_jobs import MenuJobError, MenuJobQueue
+
+
+def test_enqueue_dedups_active_jobs_by_title(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3")
+
+    first = queue.enqueue("Pulp Fiction")
+    second = queue.enqueue("  pulp   fiction ")
+    other = queue.enqueue("Ratatouille")
+
+    assert first["id"] == second["id"]
+    assert other["id"] != first["id"]
+    assert queue.get(first["id"])["status"] == "queued"
+
+
+def test_workers_run_jobs_and_retry_failures(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3", worker_count=2, max_attempts=2, poll_interval=0.01)
+    calls = []
+
+    async def handler(title, report):
+        calls.append(title)
+        report({"stage": "items", "items": [{"name": "Popcorn"}]})
+        if title == "Flaky" and calls.count("Flaky") == 1:
+            raise MenuJobError("Menu generation failed")
+        if title == "Missing":
+            raise MenuJobError("Movie not found", retry=False)
+
+    async def run():
+        queue.start(handler)
+        jobs = [queue.enqueue(title) for title in ("Flaky", "Missing", "Jaws")]
+        for _ in range(200):
+            statuses = [queue.get(job["id"])["status"] for job in jobs]
+            if all(status in ("done", "failed") for status in statuses):
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return [queue.get(job["id"]) for job in jobs]
+
+    flaky, missing, jaws = asyncio.run(run())
+
+    assert (flaky["status"], flaky["attempts"]) == ("done", 2)
+    assert (missing["status"], missing["error"]) == ("failed", "Movie not found")
+    assert jaws["status"] == "done"
+    assert jaws["progress"]["items"][0]["name"] == "Popcorn"
+    assert calls.count("Missing") == 1
+
+
+def test_queue_database_created_on_first_use(tmp_path):
+    queue = MenuJobQueue(tmp_path / "cache" / "jobs.sqlite3")
+    assert not (tmp_path / "cache").exists()
+
+    queue.enqueue("Jaws")
+
+    assert (tmp_path / "cache" / "jobs.sqlite3").exists()
+
+
+def test_progress_reports_are_coalesced(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3", poll_interval=0.01, progress_interval=0.05)
+    writes = []
+    report = queue.report
+
+    def counting_report(job_id, progress):
+        writes.append(progress["done"])
+        report(job_id, progress)
+
+    queue.report = counting_report
+
+    async def handler(title, report):
+        for done in range(50):
+            report({"done": done})
+            await asyncio.sleep(0)
+
+    async def run():
+        queue.start(handler)
+        job = await queue.aenqueue("Jaws")
+        for _ in range(200):
+            job = await queue.aget(job["id"])
+            if job["status"] == "done":
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job["status"] == "done"
+    assert job["progress"] == {"done": 49}
+    assert len(writes) <= 2
+
+
+def test_stop_requeues_running_job(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3", poll_interval=0.01)
+    started = []
+
+    async def handler(title, report):
+        started.append(title)
+        await asyncio.Event().wait()
+
+    async def run():
+        queue.start(handler)
+        job = await queue.aenqueue("Jaws")
+        while not started:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return queue.get(job["id"])
+
+    job = asyncio.run(run())
+
+    assert (job["status"], job["attempts"]) == ("queued", 0)
+    assert queue.claim()["id"] == job["id"]
+
+
+def test_expired_lease_past_max_attempts_fails(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3", max_attempts=2, lease_seconds=-1)
+    job = queue.enqueue("Crashy")
+    queue.claim()
+    assert queue.claim()["attempts"] == 2
+
+    assert queue.claim() is None
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert "Lease expired" in failed["error"]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from backend.app import agents_flow
+from backend.app.agents_flow import _MenuItemStreamParser
+
+
+def _feed_in_chunks(parser, text, size):
+    names = []
+    for start in range(0, len(text), size):
+        names.extend(item.name for item in parser.feed(text[start : start + size]))
+    return names
+
+
+def test_stream_parser_emits_items_as_objects_close():
+    text = (
+        '```json\n{"items": [{"name": "Big Kahuna Burger", "reason": "Jules {bites} it"}, '
+        '{"name": "Sprite", "reason": "\\"Refreshing\\""}], "notes": "{}"}\n```'
+    )
+    parser = _MenuItemStreamParser()
+
+    split = text.index("}") + 1
+    first = parser.feed(text[:split])
+    assert first == []
+    rest = parser.feed(text[split:])
+
+    assert [item.name for item in first + rest] == ["Big Kahuna Burger", "Sprite"]
+
+
+def test_stream_parser_handles_tiny_chunks_and_limit():
+    items = ", ".join(f'{{"name": "Item {i}", "reason": ""}}' for i in range(7))
+    text = f'{{"notes": "x", "items": [{items}]}}'
+
+    names = _feed_in_chunks(_MenuItemStreamParser(), text, 3)
+
+    assert names == [f"Item {i}" for i in range(5)]
+
+
+def test_stream_parser_ignores_objects_outside_items():
+    text = '{"movie": {"name": "Pulp Fiction", "reason": "no"}, "items": []}'
+
+    assert _feed_in_chunks(_MenuItemStreamParser(), text, 4) == []
+
+
+def test_build_menu_starts_items_mid_stream_and_cancels_dropped_ones(fake_agents):
+    streamed = (
+        '{"items": [{"name": "Shark Steak", "reason": "Bruce"}, '
+        '{"name": "Clam Chowder", "reason": "Amity"}], "notes": ""}'
+    )
+    final = json.dumps({"items": [{"name": "Clam Chowder", "reason": "Amity"}], "notes": ""})
+    resume = asyncio.Event()
+    split = streamed.index("}") + 1
+    stream = fake_agents.stream(final, streamed[:split], resume, streamed[split:])
+    started_before_end = []
+    cancelled = []
+
+    async def fake_run(agent, input, **kwargs):
+        item = input.split(": ", 1)[1]
+        if item == "Shark Steak":
+            started_before_end.append((agent.name, stream.finished))
+            if len(started_before_end) == 2:
+                resume.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(agent.name)
+                raise
+        if agent.name == "RecipeAgent":
+            return SimpleNamespace(final_output={"title": f"{item} recipe", "source": "", "url": ""})
+        return SimpleNamespace(final_output={})
+
+    fake_agents.install(lambda agent, input: stream, fake_run)
+
+    async def scenario():
+        menu = await agents_flow.build_menu("Jaws")
+        await asyncio.sleep(0)
+        return menu
+
+    menu = asyncio.run(scenario())
+
+    assert sorted(started_before_end) == [("FoodPhotoGenerator", False), ("RecipeAgent", False)]
+    assert sorted(cancelled) == ["FoodPhotoGenerator", "RecipeAgent"]
+    assert [item["name"] for item in menu["items"]] == ["Clam Chowder"]
+    assert menu["items"][0]["recipe"]["title"] == "Clam Chowder recipe"
+
+
+def test_direct_retry_streams_items(fake_agents, monkeypatch):
+    retry_text = json.dumps({"items": [{"name": "Popcorn", "reason": "Concession"}], "notes": ""})
+    resume = asyncio.Event()
+    split = retry_text.index("}") + 1
+    retry_stream = fake_agents.stream(retry_text, retry_text[:split], resume, retry_text[split:])
+    calls = []
+
+    def fake_run_streamed(agent, input, **kwargs):
+        if agent.name == "PartyPlanner":
+            return fake_agents.stream("no menu here")
+        return retry_stream
+
+    async def fake_run(agent, input, **kwargs):
+        if agent.name == "MenuFormatter":
+            return SimpleNamespace(final_output="still no menu")
+        calls.append((agent.name, retry_stream.finished))
+        if len(calls) == 2:
+            resume.set()
+        if agent.name == "RecipeAgent":
+            return SimpleNamespace(final_output={"title": "Popcorn recipe", "source": "", "url": ""})
+        return SimpleNamespace(final_output={})
+
+    fake_agents.install(fake_run_streamed, fake_run)
+    monkeypatch.setattr(agents_flow, "fetch_movie_details", lambda title: {"title": title, "year": "1975", "plot": ""})
+
+    menu = asyncio.run(agents_flow.build_menu("Jaws"))
+
+    assert sorted(calls) == [("FoodPhotoGenerator", False), ("RecipeAgent", False)]
+    assert menu["items"][0]["recipe"]["title"] == "Popcorn recipe"
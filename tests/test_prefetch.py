@@ -0,0 +1,48 @@
+from backend.app.menu_jobs import MenuJobQueue
+from backend.app.prefetch import PREFETCH_PRIORITY, MenuPrefetcher
+
+
+def test_prefetch_disabled_by_default(tmp_path):
+    prefetcher = MenuPrefetcher(MenuJobQueue(tmp_path / "jobs.sqlite3"))
+
+    assert prefetcher.prefetch("ip:1", "Jaws") is None
+
+
+def test_new_search_cancels_unstarted_prefetch(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3")
+    prefetcher = MenuPrefetcher(queue, enabled=True)
+
+    first = prefetcher.prefetch("ip:1", "Jaws")
+    second = prefetcher.prefetch("ip:1", "Alien")
+
+    assert queue.get(first)["status"] == "cancelled"
+    assert queue.get(second)["priority"] == PREFETCH_PRIORITY
+    assert prefetcher.metrics()["cancelled"] == 1
+
+
+def test_budget_and_real_jobs_are_respected(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3")
+    prefetcher = MenuPrefetcher(queue, enabled=True, budget_per_hour=1)
+    real = queue.enqueue("Heat")
+
+    assert prefetcher.prefetch("ip:1", "Heat") is None
+    assert prefetcher.prefetch("ip:2", "Jaws") is not None
+    assert prefetcher.prefetch("ip:3", "Alien") is None
+    assert queue.get(real["id"])["priority"] == 0
+    assert prefetcher.metrics()["skipped_budget"] == 1
+
+
+def test_claim_counts_hits(tmp_path):
+    queue = MenuJobQueue(tmp_path / "jobs.sqlite3")
+    prefetcher = MenuPrefetcher(queue, enabled=True)
+    prefetcher.prefetch("ip:1", "Jaws")
+    prefetcher.prefetch("ip:2", "Alien")
+    queue.claim()
+
+    running = prefetcher.claim("jaws")
+    queued = prefetcher.claim("Alien")
+
+    assert running["status"] == "running"
+    assert queued is None
+    metrics = prefetcher.metrics()
+    assert (metrics["hits"], metrics["cancelled"], metrics["hit_rate"]) == (1, 1, 0.5)
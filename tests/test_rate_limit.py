@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from backend.app import main, movie_api
+from backend.app.config import settings
+from backend.app.rate_limit import RateLimiter
+
+
+def test_search_is_rate_limited_per_client(monkeypatch):
+    settings.omdb_api_key = ""
+    settings.tmdb_api_key = "my-v3-key"
+    settings.tmdb_read_access_token = ""
+    monkeypatch.setattr(movie_api, "_search_tmdb", lambda query: [])
+    monkeypatch.setattr(main, "rate_limiter", RateLimiter({"menu": (6, 1), "search": (6, 2)}))
+
+    client = TestClient(main.app)
+    statuses = [client.get("/movies/search", params={"query": "alien"}).status_code for _ in range(3)]
+    limited = client.get("/movies/search", params={"query": "alien"})
+
+    assert statuses == [200, 200, 429]
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_menu_rejected_when_inflight_capacity_exhausted(monkeypatch):
+    monkeypatch.setattr(main, "_inflight_menus", settings.max_inflight_menus)
+
+    client = TestClient(main.app)
+    response = client.post("/movies/menu", json={"title": "Jaws"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("backend.app.rate_limit.time.monotonic", lambda: now[0])
+    limiter = RateLimiter({"menu": (6, 1)})
+
+    assert limiter.check("ip:1", "menu") == 0
+    assert limiter.check("ip:1", "menu") == 10
+    assert limiter.check("ip:2", "menu") == 0
+    now[0] += 10
+    assert limiter.check("ip:1", "menu") == 0
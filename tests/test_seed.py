@@ -0,0 +1,82 @@
+import asyncio
+import base64
+
+from backend.app import agents_flow
+from backend.app.menu_cache import MenuCache
+from backend.app.seed import SeedPack, build_seed_pack
+
+PNG = "data:image/png;base64," + base64.b64encode(b"popcorn-png").decode("ascii")
+
+
+def test_build_seed_pack_from_popular_items(tmp_path, monkeypatch):
+    cache = MenuCache(tmp_path / "menus")
+    recipe = {"title": "Stovetop popcorn", "source": "", "url": ""}
+    cache.set("Jaws", {"items": [{"name": "Popcorn", "reason": "", "recipe": recipe}]})
+    cache.set("Grease", {"items": [{"name": "popcorn", "reason": ""}, {"name": "Milkshake", "reason": ""}]})
+    generated = []
+
+    async def fake_recipe(name):
+        generated.append(name)
+        return {"title": f"{name} recipe", "source": "", "url": ""}
+
+    async def fake_image(item):
+        return PNG
+
+    monkeypatch.setattr(agents_flow, "menu_cache", cache)
+    monkeypatch.setattr(agents_flow, "fetch_item_recipe", fake_recipe)
+    monkeypatch.setattr(agents_flow, "fetch_item_image", fake_image)
+
+    asyncio.run(build_seed_pack(tmp_path / "seed", top_k=2, version="v1"))
+    asyncio.run(build_seed_pack(tmp_path / "seed", top_k=1, version="v2"))
+    pack = SeedPack.load(tmp_path / "seed")
+
+    assert pack.version == "v2"
+    assert list(pack.items) == ["popcorn"]
+    assert pack.items["popcorn"]["count"] == 2
+    assert pack.recipe(" Popcorn ") == recipe
+    assert pack.image("POPCORN") == PNG
+    assert generated == ["Milkshake"]
+    assert SeedPack.load(tmp_path / "seed" / "v1").recipe("milkshake")["title"] == "Milkshake recipe"
+
+
+def test_fetch_item_recipe_uses_seed_pack_first(monkeypatch):
+    pack = SeedPack(manifest={"version": "v1", "items": {"popcorn": {"recipe": {"title": "Seeded"}}}})
+    monkeypatch.setattr(agents_flow, "seed_pack", pack)
+
+    async def fail_run(*args, **kwargs):
+        raise AssertionError("agent should not run")
+
+    monkeypatch.setattr(agents_flow.Runner, "run", fail_run)
+
+    assert asyncio.run(agents_flow.fetch_item_recipe("Popcorn")) == {"title": "Seeded"}
+
+
+def test_seed_pack_skips_placeholder_recipes(tmp_path, monkeypatch):
+    cache = MenuCache(tmp_path / "menus")
+    monkeypatch.setattr(agents_flow, "search_recipes", lambda query, limit: [])
+    placeholder = asyncio.run(agents_flow._fallback_recipe("Nachos"))
+    cache.set("Alien", {"items": [{"name": "Nachos", "reason": "", "recipe": placeholder}]})
+
+    async def fake_image(item):
+        return PNG
+
+    monkeypatch.setattr(agents_flow, "menu_cache", cache)
+    monkeypatch.setattr(agents_flow, "fetch_item_recipe", agents_flow._fallback_recipe)
+    monkeypatch.setattr(agents_flow, "fetch_item_image", fake_image)
+
+    asyncio.run(build_seed_pack(tmp_path / "seed", top_k=1, version="v1"))
+    pack = SeedPack.load(tmp_path / "seed")
+
+    assert pack.recipe("nachos") is None
+    assert pack.image("nachos") == PNG
+
+
+def test_seed_image_is_kept_in_memory_cache(tmp_path, monkeypatch):
+    (tmp_path / "popcorn.png").write_bytes(b"popcorn-png")
+    pack = SeedPack(tmp_path, {"version": "v1", "items": {"popcorn": {"image": "popcorn.png"}}})
+    memory = agents_flow.MemoryLRUCache()
+    monkeypatch.setattr(agents_flow, "seed_pack", pack)
+    monkeypatch.setattr(agents_flow, "image_memory_cache", memory)
+
+    assert asyncio.run(agents_flow.fetch_item_image({"name": "Popcorn"})) == PNG
+    assert memory.get("popcorn") == PNG
@@ -0,0 +1,70 @@
+import asyncio
+
+from backend.app import agents_flow, main
+from bench.soak import run_soak
+
+
+def test_short_soak_run_reports_samples_and_restores_stubs():
+    run = agents_flow.Runner.__dict__["run"]
+    menu_cache = agents_flow.menu_cache
+
+    report = asyncio.run(
+        run_soak(
+            duration=1.0,
+            concurrency=2,
+            warmup=0.3,
+            sample_interval=0.3,
+            max_rss_growth_mb=1024,
+            max_fd_growth=64,
+            max_lag_ms=10_000,
+            image_kb=1,
+        )
+    )
+
+    assert report["failures"] == []
+    assert report["shed_ratio"] == 0
+    assert len(report["samples"]) >= 2
+    assert report["baseline"]["open_fds"] is not None
+    assert report["statuses"]["menu"].get(200) or report["statuses"]["search"].get(200)
+    assert agents_flow.Runner.__dict__["run"] is run
+    assert agents_flow.menu_cache is menu_cache is main.menu_cache
+
+
+def test_soak_flags_growth_beyond_thresholds():
+    report = asyncio.run(
+        run_soak(
+            duration=0.6,
+            concurrency=1,
+            warmup=0.0,
+            sample_interval=0.3,
+            max_rss_growth_mb=1024,
+            max_fd_growth=-1,
+            max_lag_ms=10_000,
+            image_kb=1,
+            trace=False,
+        )
+    )
+
+    assert any(failure.startswith("Open file descriptors grew") for failure in report["failures"])
+
+
+def test_soak_fails_when_menus_are_shed(monkeypatch):
+    monkeypatch.setattr(main, "_inflight_menus", 10_000)
+
+    report = asyncio.run(
+        run_soak(
+            duration=0.6,
+            concurrency=2,
+            warmup=0.0,
+            sample_interval=0.3,
+            max_rss_growth_mb=1024,
+            max_fd_growth=64,
+            max_lag_ms=10_000,
+            search_ratio=0.0,
+            image_kb=1,
+            trace=False,
+        )
+    )
+
+    assert report["shed_ratio"] == 1.0
+    assert any("shed with 503" in failure for failure in report["failures"])
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.app import agents_flow, main
+from backend.app.usage import UsageLedger, UsageReport, load_prices
+
+
+def test_ledger_prices_usage_and_tracks_budget():
+    report = UsageReport(load_prices('{"cheap": [1, 2], "broken": "x"}'))
+    ledger = UsageLedger("Jaws", report, budget=0.003)
+
+    ledger.record("menu", "cheap", SimpleNamespace(input_tokens=1000, output_tokens=500), 1.5)
+    assert ledger.cost == 0.002
+    assert not ledger.over_budget
+    ledger.record("recipe", "unknown-model", None, 0.5)
+    ledger.record("recipe", "cheap", SimpleNamespace(input_tokens=1000, output_tokens=0), 0.5)
+
+    assert ledger.over_budget
+    report.add_menu(ledger)
+    body = report.report()
+    assert body["menus"] == 1
+    assert body["stages"]["recipe"]["calls"] == 2
+    assert body["stages"]["recipe"]["avg_seconds"] == 0.5
+    assert body["stages"]["recipe"]["models"] == {"unknown-model": 1, "cheap": 1}
+    assert body["recent"][0]["cost_usd"] == 0.003
+
+
+def test_build_menu_routes_and_stops_spending_over_budget(fake_agents, monkeypatch):
+    calls = []
+
+    async def fake_run(agent, input, **kwargs):
+        calls.append(agent.name)
+        return SimpleNamespace(final_output={}, context_wrapper=SimpleNamespace(usage=None))
+
+    menu_text = json.dumps(
+        {"items": [{"name": "Clam Chowder", "reason": "Amity"}, {"name": "Taffy", "reason": "Boardwalk"}], "notes": ""}
+    )
+    split = menu_text.index("}") + 1
+    usage = SimpleNamespace(input_tokens=1000, output_tokens=500)
+    # An earlier model response completes first; item tasks get to run mid-stream.
+    stream = fake_agents.stream(menu_text, menu_text[:split], 0.01, menu_text[split:], usage=usage)
+    fake_agents.install(lambda agent, input: stream, fake_run)
+    monkeypatch.setattr(agents_flow, "search_recipes", lambda query, limit: [])
+    report = UsageReport({agents_flow.manager.model: (1000.0, 1000.0)})
+    monkeypatch.setattr(agents_flow, "usage_report", report)
+    monkeypatch.setattr(main, "usage_report", report)
+    monkeypatch.setattr(agents_flow.settings, "menu_budget_usd", 0.5)
+
+    menu = asyncio.run(agents_flow.build_menu("Jaws"))
+
+    # The menu's first response alone spends $1.50, so no image or recipe agents run.
+    assert calls == []
+    assert menu["items"][0]["recipe"]["title"] == "Clam Chowder"
+    body = TestClient(main.app).get("/metrics/usage").json()
+    assert body["stages"]["menu"]["input_tokens"] == 1000
+    assert body["recent"][0]["over_budget"] is True
+
+
+def test_mechanical_agents_use_fast_model():
+    fast = agents_flow.settings.openai_fast_model
+    assert agents_flow.menu_formatter.model == fast
+    assert agents_flow.food_photo_generator.model == fast
+    assert agents_flow.movie_searcher.model == fast
+    assert agents_flow.recipe_agent.model == agents_flow.settings.openai_model